@@ -0,0 +1,6 @@
+from ai_tools_for_publishing.utils import lazy_imports
+from .default_config import DEFAULT_CONFIG
+from .cli import cli
+
+# Voikko, BeautifulSoup and friends are imported only when needed
+__getattr__ = lazy_imports(__name__, {"main": ".main"})
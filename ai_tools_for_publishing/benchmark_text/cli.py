@@ -0,0 +1,67 @@
+import os.path
+import argparse
+import platformdirs
+from ai_tools_for_publishing.cli import set_up_and_run_application, VERBOSITY
+from ai_tools_for_publishing import utils
+from .default_config import DEFAULT_CONFIG
+
+# fmt: off
+# -----------------------------------------------------------------------------
+
+(PARENT_NAME, APP_NAME) = __package__.split(".")
+APP_DESCRIPTION = """
+Benchmark reading, hyphenating and writing documents stage by stage.
+
+  generate -O DIR              write synthetic Finnish-like corpora to DIR
+  run CORPUS... -r RESULTS     time each stage for each corpus file
+  compare OLD NEW              flag stages that got slower than the threshold
+"""
+CLI_CONFIG = {
+    "config_file": os.path.join(
+        platformdirs.user_config_dir(PARENT_NAME), f"{APP_NAME}.config"
+    ),
+    "verbosity": "WARNING",
+    "log_file": os.path.join(platformdirs.user_log_dir(PARENT_NAME), f"{APP_NAME}.log"),
+    "log_file_format": "%(asctime)s %(levelname)s %(name)s %(message)s",
+    "log_level": "NONE",
+    "log_max_bytes": 1000 * 1024,
+    "log_max_files": 10,
+    "hyphenations_index_dir": os.path.join(platformdirs.user_cache_dir(PARENT_NAME), "hyphenations"),
+}
+APP_CFG = DEFAULT_CONFIG | CLI_CONFIG
+APP_USAGE = lambda: f"""
+default configuration:
+---
+{utils.dict_to_yaml_str(APP_CFG)}
+"""
+APP_CLI_ARGUMENTS = (
+(("command",                    ),{ "choices": ("generate", "run", "compare"),                   "help": "what to do", }),
+(("input_files",                ),{ "nargs": "*",                "metavar": "FILE",              "help": "corpus files to run or result files to compare", }),
+(("-v",      "--verbosity",     ),{ "dest": "verbosity",         "action": "count",              "help": "set output verbosity (-v = WARNING, -vv = INFO, -vvv = DEBUG)", }),
+(("-q",      "--quiet",         ),{ "dest": "verbosity",         "action": "store_const", "const": -1, "help": "Do not output anything", }),
+(("-O",      "--output-path",   ),{ "dest": "output_path",       "metavar": "PATH",              "help": "output directory for generated corpora", }),
+(("--sizes",                    ),{ "dest": "corpus_sizes",      "metavar": "SIZES",             "help": f"sizes of generated corpora (Default: {DEFAULT_CONFIG['corpus_sizes']})", }),
+(("--formats",                  ),{ "dest": "corpus_formats",    "metavar": "FORMATS",           "help": f"formats of generated corpora (Default: {DEFAULT_CONFIG['corpus_formats']})", }),
+(("--vocabulary-size",          ),{ "dest": "vocabulary_size",   "metavar": "N", "type": int,    "help": f"number of distinct base words (Default: {DEFAULT_CONFIG['vocabulary_size']})", }),
+(("--punctuation-density",      ),{ "dest": "punctuation_density", "metavar": "P", "type": float, "help": f"probability of punctuation after a word (Default: {DEFAULT_CONFIG['punctuation_density']})", }),
+(("--tag-density",              ),{ "dest": "tag_density",       "metavar": "P", "type": float,  "help": f"probability of an inline tag around a word (Default: {DEFAULT_CONFIG['tag_density']})", }),
+(("--seed",                     ),{ "dest": "seed",              "metavar": "N", "type": int,    "help": f"random seed for generating corpora (Default: {DEFAULT_CONFIG['seed']})", }),
+(("-r",      "--results",       ),{ "dest": "results_file",      "metavar": "RESULTS.json",      "help": "write the results to this file instead of STDOUT", }),
+(("-n",      "--repeat",        ),{ "dest": "repeat",            "metavar": "N", "type": int,    "help": f"run each corpus N times and keep the median (Default: {DEFAULT_CONFIG['repeat']})", }),
+(("--parser",                   ),{ "dest": "parser",            "metavar": "PARSER", "choices": ("auto", "lxml", "html5lib", "html.parser"), "help": "HTML parser (auto, lxml, html5lib, html.parser) (Default: auto = lxml if installed)", }),
+(("-k", "--known-hyphenations", ),{ "dest": "hyphenations_file", "metavar": "HYPHENATIONS.yaml", "help": "read known hyphenations from this file (YAML format)", }),
+(("--threshold",                ),{ "dest": "threshold",         "metavar": "RATIO", "type": float, "help": f"relative slowdown that is a regression (Default: {DEFAULT_CONFIG['threshold']})", }),
+(("--config",                   ),{ "dest": "config_file",       "metavar": "CONFIG.yaml",       "help": "read configuration from this file (YAML format)", }),
+(("--log-level",                ),{ "dest": "log_level",         "metavar": "LEVEL", "choices": VERBOSITY.keys(), "help": f"set logging level ({ ', '.join(list(VERBOSITY.keys())) }) (Default: {APP_CFG['log_level']})", }),
+(("--loglevel",                 ),{ "dest": "log_level",         "choices": VERBOSITY.keys(),    "help": argparse.SUPPRESS, }),
+)
+
+# -----------------------------------------------------------------------------
+
+def run_main(cfg):
+    # Import the application only after the command line has been parsed
+    from . import main
+    main(cfg)
+
+def cli():
+    set_up_and_run_application(APP_NAME, APP_DESCRIPTION, APP_USAGE, APP_CLI_ARGUMENTS, APP_CFG, run_main)
@@ -0,0 +1,40 @@
+from typing import Any, Dict
+
+
+def compare_results(
+    old_results: Dict[str, Any], new_results: Dict[str, Any], cfg: Dict[str, Any]
+) -> int:
+    """
+    Print a table comparing the stage timings of two benchmark results and
+    return the number of regressions. A stage has regressed if it is more than
+    `threshold` slower, and by more than `min_difference` seconds.
+    """
+    regressions = 0
+    print(f"{'corpus / stage':<40} {'old (s)':>10} {'new (s)':>10} {'change':>8}")
+
+    for corpus, new_corpus in new_results["corpora"].items():
+        old_corpus = old_results["corpora"].get(corpus)
+        if not old_corpus:
+            print(f"{corpus:<40} {'':>10} {'':>10} {'new':>8}")
+            continue
+
+        print(corpus)
+        old_stages = old_corpus["stages"] | {"total": old_corpus["total"]}
+        new_stages = new_corpus["stages"] | {"total": new_corpus["total"]}
+        for stage, new_time in new_stages.items():
+            old_time = old_stages.get(stage)
+            if old_time is None:
+                continue
+
+            change = (new_time - old_time) / old_time if old_time else 0.0
+            regressed = (
+                change > cfg["threshold"]
+                and new_time - old_time > cfg["min_difference"]
+            )
+            regressions += regressed
+            print(
+                f"  {stage:<38} {old_time:>10.4f} {new_time:>10.4f} {change:>+8.1%}"
+                + ("  REGRESSION" if regressed else "")
+            )
+
+    return regressions
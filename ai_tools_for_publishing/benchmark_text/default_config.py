@@ -0,0 +1,15 @@
+DEFAULT_CONFIG = {
+    "corpus_sizes": "10KB,1MB,10MB,50MB",
+    "corpus_formats": "html,md",
+    "vocabulary_size": 20000,
+    "punctuation_density": 0.15,
+    "tag_density": 0.05,
+    "seed": 1,
+    "repeat": 3,
+    "threshold": 0.1,
+    "min_difference": 0.005,
+    "parser": "auto",
+    "hyphenations_file": None,
+    "min_word_length": 5,
+    "allow_unknown": False,
+}
@@ -0,0 +1,156 @@
+import os.path
+import random
+import itertools
+from typing import Any, Dict, List
+
+SIZE_UNITS = {"": 1, "B": 1, "KB": 1024, "MB": 1024**2, "GB": 1024**3}
+
+# Building blocks of Finnish-looking words
+CONSONANTS = "hjklmnprstv"
+VOWELS = (
+    "a",
+    "e",
+    "i",
+    "o",
+    "u",
+    "y",
+    "ä",
+    "ö",
+    "aa",
+    "ii",
+    "uu",
+    "ää",
+    "ai",
+    "ei",
+    "uo",
+    "ie",
+    "yö",
+)
+CODAS = ("", "", "", "n", "s", "t", "l", "r", "k")
+ENDINGS = (
+    "",
+    "",
+    "",
+    "",
+    "n",
+    "t",
+    "ssa",
+    "lla",
+    "sta",
+    "lle",
+    "ksi",
+    "kin",
+    "ko",
+    "han",
+    "nen",
+    "ista",
+    "aan",
+)
+
+# Punctuation after a word, and the ones that end a sentence
+PUNCTUATION = (",", ",", ",", ".", ".", ";", ":", "!", "?", "…")
+SENTENCE_ENDS = (".", "!", "?", "…")
+
+INLINE_TAGS = {
+    "html": (("<em>", "</em>"), ("<strong>", "</strong>"), ('<a href="#">', "</a>")),
+    "md": (("*", "*"), ("**", "**"), ("[", "](#)")),
+}
+
+
+def parse_size(size: str) -> int:
+    """Convert a size such as "10KB" or "50MB" into bytes."""
+    size = size.strip().upper()
+    number = size.rstrip("KMGB")
+    unit = size[len(number) :]
+    if unit and not unit.endswith("B"):
+        unit += "B"
+    if not number.isdigit() or unit not in SIZE_UNITS:
+        raise ValueError(f"Unknown size '{size}'")
+    return int(number) * SIZE_UNITS[unit]
+
+
+def build_vocabulary(rng: random.Random, vocabulary_size: int) -> List[str]:
+    """Return a list of Finnish-looking words, some of them compounds."""
+    stems = [
+        "".join(
+            rng.choice(CONSONANTS) + rng.choice(VOWELS) + rng.choice(CODAS)
+            for _ in range(rng.randint(1, 4))
+        )
+        for _ in range(vocabulary_size)
+    ]
+    return [
+        (stem + rng.choice(stems) if rng.random() < 0.1 else stem) + rng.choice(ENDINGS)
+        for stem in stems
+    ]
+
+
+def generate_corpus(output_file: str, size: int, cfg: Dict[str, Any]) -> None:
+    """
+    Write a reproducible Finnish-like HTML or Markdown document of about
+    `size` bytes. Word frequencies follow Zipf's law.
+    """
+    _, file_extension = os.path.splitext(output_file)
+    format = "md" if file_extension[1:2].lower() == "m" else "html"
+    rng = random.Random(f"{cfg['seed']}-{size}-{format}")
+
+    vocabulary = build_vocabulary(rng, cfg["vocabulary_size"])
+    cum_weights = list(
+        itertools.accumulate(1 / n for n in range(1, len(vocabulary) + 1))
+    )
+    inline_tags = INLINE_TAGS[format]
+    punctuation_density = cfg["punctuation_density"]
+    tag_density = cfg["tag_density"]
+
+    def paragraph() -> str:
+        words = []
+        capitalize = True
+        for word in rng.choices(
+            vocabulary, cum_weights=cum_weights, k=rng.randint(20, 150)
+        ):
+            if capitalize:
+                word = word.capitalize()
+            capitalize = False
+            if rng.random() < tag_density:
+                start, end = rng.choice(inline_tags)
+                word = start + word + end
+            if rng.random() < punctuation_density:
+                punctuation = rng.choice(PUNCTUATION)
+                word += punctuation
+                capitalize = punctuation in SENTENCE_ENDS
+            elif rng.random() < punctuation_density / 10:
+                word = f"”{word}”" if rng.random() < 0.5 else f"{word} –"
+            words.append(word)
+        return " ".join(words).rstrip(" ,;:–") + rng.choice(SENTENCE_ENDS)
+
+    def heading() -> str:
+        words = rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(1, 5))
+        return " ".join(words).capitalize()
+
+    if format == "html":
+        header = '<!DOCTYPE html>\n<html lang="fi">\n<head>\n<meta charset="utf-8">\n<title>Korpus</title>\n</head>\n<body>\n'
+        footer = "</body>\n</html>\n"
+    else:
+        header = "# Korpus\n\n"
+        footer = ""
+
+    with open(output_file, "w", encoding="utf-8") as file:
+        file.write(header)
+        written = len(header.encode("utf-8"))
+        paragraphs = 0
+        while written < size - len(footer):
+            if paragraphs % 20 == 0:
+                text = (
+                    f"<h2>{heading()}</h2>\n"
+                    if format == "html"
+                    else f"## {heading()}\n\n"
+                )
+            else:
+                text = (
+                    f"<p>{paragraph()}</p>\n"
+                    if format == "html"
+                    else f"{paragraph()}\n\n"
+                )
+            file.write(text)
+            written += len(text.encode("utf-8"))
+            paragraphs += 1
+        file.write(footer)
@@ -0,0 +1,52 @@
+import os.path
+import json
+import logging
+from typing import Any, Dict
+from .generate_corpus import generate_corpus, parse_size
+from .run_benchmark import run_benchmark
+from .compare_results import compare_results
+
+
+def main(cfg: Dict[str, Any]) -> None:
+    """Generate corpora, benchmark them or compare the results."""
+
+    log = logging.getLogger(__name__)
+
+    input_files = cfg.get("input_files")
+    output_path = cfg.get("output_path")
+
+    # Generate a corpus of each size and format
+    if cfg["command"] == "generate":
+        if output_path and not os.path.isdir(output_path):
+            raise FileNotFoundError(f"'{output_path}' is not a directory")
+        for size in cfg["corpus_sizes"].split(","):
+            for format in cfg["corpus_formats"].split(","):
+                output_file = os.path.join(
+                    output_path or "", f"corpus_{size.strip()}.{format.strip()}"
+                )
+                log.info("Generating %s...", output_file)
+                generate_corpus(output_file, parse_size(size), cfg)
+
+    # Time the stages of processing each corpus
+    elif cfg["command"] == "run":
+        if not input_files:
+            raise ValueError("No corpus files")
+        results = run_benchmark(input_files, cfg)
+        if cfg.get("results_file"):
+            with open(cfg["results_file"], "w") as file:
+                json.dump(results, file, indent=2)
+            log.info("Results written to %s", cfg["results_file"])
+        else:
+            print(json.dumps(results, indent=2))
+
+    # Compare two results
+    elif cfg["command"] == "compare":
+        if not input_files or len(input_files) != 2:
+            raise ValueError("Give two result files to compare")
+        with open(input_files[0]) as file:
+            old_results = json.load(file)
+        with open(input_files[1]) as file:
+            new_results = json.load(file)
+        regressions = compare_results(old_results, new_results, cfg)
+        if regressions:
+            raise RuntimeError(f"{regressions} stages are slower than before")
@@ -0,0 +1,195 @@
+import gc
+import os.path
+import time
+import collections
+import logging
+import platform
+import statistics
+import tempfile
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Tuple
+from ai_tools_for_publishing.reformat_text import (
+    DEFAULT_CONFIG as REFORMAT_TEXT_DEFAULT_CONFIG,
+    read_file_to_document,
+    get_body_from_soup,
+    write_soup_to_file,
+)
+from ai_tools_for_publishing.reformat_text.read_document import get_parser
+from ai_tools_for_publishing.hyphenate_text import (
+    hyphenate_body as hyphenate_body_module,
+)
+from ai_tools_for_publishing.hyphenate_text.hyphenate_body import hyphenate_body
+from ai_tools_for_publishing.hyphenate_text.known_hyphenations import KnownHyphenations
+from ai_tools_for_publishing.hyphenate_text.voikko import get_voikko_version
+
+STAGES = (
+    "reading",
+    "parsing",
+    "tokenizing",
+    "voikko",
+    "lookups",
+    "rewriting",
+    "tree_mutation",
+    "writing",
+)
+
+
+def timed(function: Callable, timings: Dict[str, float], stage: str) -> Callable:
+    """Return a function that adds the time spent in `function` to a stage."""
+
+    def timed_function(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            timings[stage] += time.perf_counter() - start
+            timings[f"{stage}_calls"] += 1
+
+    return timed_function
+
+
+def time_stages(
+    input_file: str,
+    known_hyphenations: Dict[str, str],
+    output_path: str,
+    cfg: Dict[str, Any],
+) -> Dict[str, float]:
+    """
+    Read, hyphenate and write a document once and return the time spent in
+    each stage. The functions of hyphenate_body are wrapped with timers for
+    the duration of the run, so the code being timed is the real one.
+    """
+    timings = collections.defaultdict(float)
+
+    originals = {
+        "tokenize": hyphenate_body_module.tokenize,
+        "hyphenate_with_voikko": hyphenate_body_module.hyphenate_with_voikko,
+        "look_up_word": hyphenate_body_module.look_up_word,
+        "hyphenate_texts": hyphenate_body_module.hyphenate_texts,
+    }
+    hyphenate_body_module.tokenize = timed(originals["tokenize"], timings, "tokenizing")
+    hyphenate_body_module.hyphenate_with_voikko = timed(
+        originals["hyphenate_with_voikko"], timings, "voikko"
+    )
+    hyphenate_body_module.look_up_word = timed(
+        originals["look_up_word"], timings, "lookups"
+    )
+    hyphenate_body_module.hyphenate_texts = timed(
+        originals["hyphenate_texts"], timings, "hyphenate_texts"
+    )
+
+    try:
+        start = time.perf_counter()
+        with open(input_file, "rb") as file:
+            file.read()
+        timings["reading"] = time.perf_counter() - start
+
+        # Reading the file again is included in parsing, so subtract it
+        start = time.perf_counter()
+        soup = read_file_to_document(input_file, cfg["parser"])
+        body = get_body_from_soup(soup)
+        timings["parsing"] = max(0.0, time.perf_counter() - start - timings["reading"])
+
+        start = time.perf_counter()
+        hyphenate_body(body, known_hyphenations, cfg, None, dict())
+        hyphenating = time.perf_counter() - start
+
+        start = time.perf_counter()
+        write_soup_to_file(
+            input_file,
+            soup,
+            REFORMAT_TEXT_DEFAULT_CONFIG
+            | cfg
+            | {
+                "output_path": output_path,
+                "output_name": "{name}{ext}",
+                "output_format": "html",
+                "overwrite": True,
+                "dry_run": False,
+            },
+        )
+        timings["writing"] = time.perf_counter() - start
+
+    finally:
+        for name, function in originals.items():
+            setattr(hyphenate_body_module, name, function)
+
+    # What is left of hyphenating texts is collecting and rewriting tokens,
+    # and what is left of hyphenating the body is walking and mutating the tree
+    timings["rewriting"] = max(
+        0.0,
+        timings["hyphenate_texts"]
+        - timings["tokenizing"]
+        - timings["voikko"]
+        - timings["lookups"],
+    )
+    timings["tree_mutation"] = max(0.0, hyphenating - timings["hyphenate_texts"])
+    return timings
+
+
+def measure_parsing_memory(input_file: str, cfg: Dict[str, Any]) -> Tuple[int, int]:
+    """
+    Return the peak memory allocated by Python objects while parsing a
+    document, and the memory kept by the document after that. Memory
+    allocated by C libraries, such as lxml, is not seen.
+    """
+    tracemalloc.start()
+    try:
+        document = read_file_to_document(input_file, cfg["parser"])
+        gc.collect()
+        document_bytes, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak, document_bytes
+
+
+def run_benchmark(input_files: List[str], cfg: Dict[str, Any]) -> Dict[str, Any]:
+    """Time the stages of processing each corpus and return the results."""
+    log = logging.getLogger(__name__)
+
+    known_hyphenations = dict()
+    if cfg["hyphenations_file"]:
+        known_hyphenations = KnownHyphenations(
+            cfg["hyphenations_file"], cfg["hyphenations_index_dir"]
+        )
+
+    hyphenate_cfg = cfg | {"threads": 1}
+    results = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "voikko": get_voikko_version(),
+        "parser": get_parser(cfg["parser"]),
+        "corpora": dict(),
+    }
+
+    with tempfile.TemporaryDirectory() as output_path:
+        for input_file in input_files:
+            log.info("Benchmarking %s...", input_file)
+            runs = [
+                time_stages(input_file, known_hyphenations, output_path, hyphenate_cfg)
+                for _ in range(max(1, cfg["repeat"]))
+            ]
+
+            # The median of each stage is less sensitive to noise than the mean
+            stages = {
+                stage: statistics.median(run[stage] for run in runs) for stage in STAGES
+            }
+            parsing_peak_bytes, document_bytes = measure_parsing_memory(input_file, cfg)
+            results["corpora"][os.path.basename(input_file)] = {
+                "bytes": os.path.getsize(input_file),
+                "runs": len(runs),
+                "voikko_calls": int(runs[0]["voikko_calls"]),
+                "lookups": int(runs[0]["lookups_calls"]),
+                "parsing_peak_bytes": parsing_peak_bytes,
+                "document_bytes": document_bytes,
+                "stages": stages,
+                "total": sum(stages.values()),
+            }
+            log.info(
+                "Benchmarked %s",
+                input_file,
+                extra=results["corpora"][os.path.basename(input_file)],
+            )
+
+    return results
@@ -1,3 +1,4 @@
 from .set_up_and_run_application import set_up_and_run_application
 from .logging import set_up_loggers, VERBOSITY
 from .config import set_up_config
+from .parallel import map_in_processes, map_in_pipeline
@@ -1,23 +1,33 @@
 import argparse
-from typing import Dict, Tuple, Any
+from typing import Callable, Dict, Tuple, Any, Union
+
+
+class ArgumentParser(argparse.ArgumentParser):
+    """An argument parser that can create its epilog only when help is needed."""
+
+    def format_help(self) -> str:
+        if callable(self.epilog):
+            self.epilog = self.epilog()
+        return super().format_help()
 
 
 def parse_arguments(
     APP_NAME: str,
     APP_DESCRIPTION: str,
-    APP_USAGE: str,
+    APP_USAGE: Union[str, Callable[[], str]],
     APP_CLI_ARGUMENTS: Tuple[Tuple],
 ) -> Dict[str, Any]:
     """Parse command-line arguments.
 
     :param APP_NAME:          The name of the application.
     :param APP_DESCRIPTION:   A brief description of the application.
-    :param APP_USAGE:         Usage information for the application.
+    :param APP_USAGE:         Usage information for the application
+                              (or a function returning it).
     :param APP_CLI_ARGUMENTS: List of command-line arguments to parse.
 
     :return: A dictionary with the parsed arguments.
     """
-    argparser = argparse.ArgumentParser(
+    argparser = ArgumentParser(
         prog=APP_NAME,
         description=APP_DESCRIPTION,
         epilog=APP_USAGE,
@@ -29,7 +39,12 @@ def parse_arguments(
         argparser.add_argument(*arg[0], **arg[1])
     args_cfg = vars(argparser.parse_args())
 
-    # Remove empty arguments so that they don't override the .config file
-    args_cfg = {name: value for name, value in args_cfg.items() if value}
+    # Remove empty arguments so that they don't override the .config file,
+    # but keep numbers, so that 0 can be given
+    args_cfg = {
+        name: value
+        for name, value in args_cfg.items()
+        if value or type(value) in (int, float)
+    }
 
     return args_cfg
@@ -1,6 +1,6 @@
 import os.path
 from typing import Any
-from ai_tools_for_publishing.utils import read_yaml_file_to_dict
+from ai_tools_for_publishing import utils
 
 
 def set_up_config(
@@ -9,9 +9,9 @@ def set_up_config(
     """Build configuration for the application."""
 
     if "config_file" in overrides:
-        config_from_file = read_yaml_file_to_dict(overrides["config_file"])
+        config_from_file = utils.read_yaml_file_to_dict(overrides["config_file"])
     elif "config_file" in defaults and os.path.exists(defaults["config_file"]):
-        config_from_file = read_yaml_file_to_dict(defaults["config_file"])
+        config_from_file = utils.read_yaml_file_to_dict(defaults["config_file"])
     else:
         config_from_file = {}
 
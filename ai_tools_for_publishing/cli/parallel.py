@@ -0,0 +1,128 @@
+import logging
+import logging.handlers
+import threading
+import itertools
+import collections
+import multiprocessing
+from concurrent.futures import CancelledError, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator
+
+
+def set_up_worker_loggers(
+    log_queue: multiprocessing.Queue,
+    level: int,
+    initializer: Callable = None,
+    initargs: tuple = (),
+) -> None:
+    """
+    Send all log records of a worker process to the main process,
+    then call the actual initializer of the worker.
+    """
+    logger = logging.getLogger()
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setLevel(level)
+    logger.addHandler(queue_handler)
+    logger.setLevel(logging.NOTSET)
+
+    if initializer:
+        initializer(*initargs)
+
+
+def map_in_processes(
+    function: Callable,
+    items: Iterable[Any],
+    jobs: int,
+    initializer: Callable = None,
+    initargs: tuple = (),
+) -> Iterator[Any]:
+    """
+    Call `function` for every item in a pool of `jobs` worker processes
+    and yield the results in the order of the items.
+
+    Log records of the workers are handled by the loggers of the main process.
+    """
+    handlers = logging.getLogger().handlers
+    level = min((handler.level for handler in handlers), default=logging.NOTSET)
+
+    log_queue = multiprocessing.Queue()
+    listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    listener.start()
+    try:
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=set_up_worker_loggers,
+            initargs=(log_queue, level, initializer, initargs),
+        ) as executor:
+            yield from executor.map(function, items)
+    finally:
+        listener.stop()
+
+
+def map_in_pipeline(
+    read: Callable[[Any], Any],
+    process: Callable[[Any, Any], Any],
+    write: Callable[[Any, Any], Any],
+    items: Iterable[Any],
+    prefetch: int,
+) -> Iterator[Any]:
+    """
+    Call `read(item)`, then `process(item, read_value)` and finally
+    `write(item, processed_value)` for every item and yield the results of
+    `write` in the order of the items.
+
+    Up to `prefetch` items are read ahead in a reader thread and written in
+    a writer thread, while the calling thread processes the current one, so
+    waiting for the disk (or network) overlaps with processing. At most
+    `prefetch` items wait for each stage, which caps the memory used. With
+    a `prefetch` of 0, the items are read, processed and written one by one.
+
+    An exception is raised in the calling thread when its item comes up, and
+    nothing is written after it, like when the items are handled one by one.
+    """
+    if prefetch < 1:
+        for item in items:
+            yield write(item, process(item, read(item)))
+        return
+
+    failed = threading.Event()
+
+    def write_unless_failed(item: Any, processed_value: Any) -> Any:
+        if failed.is_set():
+            raise CancelledError()
+        try:
+            return write(item, processed_value)
+        except BaseException:
+            failed.set()
+            raise
+
+    items = iter(items)
+    reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reader")
+    writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="writer")
+    try:
+        reads = collections.deque(
+            (item, reader.submit(read, item))
+            for item in itertools.islice(items, prefetch)
+        )
+        writes = collections.deque()
+        while reads:
+            item, read_value = reads.popleft()
+            for next_item in itertools.islice(items, 1):
+                reads.append((next_item, reader.submit(read, next_item)))
+
+            processed_value = process(item, read_value.result())
+            writes.append(writer.submit(write_unless_failed, item, processed_value))
+            while writes and (len(writes) > prefetch or writes[0].done()):
+                yield writes.popleft().result()
+
+        while writes:
+            yield writes.popleft().result()
+
+    # Finish the items being read and written, but do not start the others
+    finally:
+        reader.shutdown(cancel_futures=True)
+        writer.shutdown(cancel_futures=True)
@@ -1,6 +1,6 @@
 import sys
 import logging
-from typing import Callable, Dict, Tuple, Any
+from typing import Callable, Dict, Tuple, Any, Union
 from .arguments import parse_arguments
 from .config import set_up_config
 from .logging import set_up_loggers, VERBOSITY
@@ -9,7 +9,7 @@ from .logging import set_up_loggers, VERBOSITY
 def set_up_and_run_application(
     APP_NAME: str,
     APP_DESCRIPTION: str,
-    APP_USAGE: str,
+    APP_USAGE: Union[str, Callable[[], str]],
     APP_CLI_ARGUMENTS: Tuple[Tuple],
     APP_CFG: Dict[str, Any],
     main: Callable,
@@ -19,7 +19,8 @@ def set_up_and_run_application(
 
     :param APP_NAME:          The name of the application.
     :param APP_DESCRIPTION:   A brief description of the application.
-    :param APP_USAGE:         Usage information for the application.
+    :param APP_USAGE:         Usage information for the application
+                              (or a function returning it).
     :param APP_CLI_ARGUMENTS: List of command-line arguments to parse.
     :param APP_CFG:           Default configuration for the application.
     :param main:              The main function of the application
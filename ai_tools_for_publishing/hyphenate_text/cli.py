@@ -2,13 +2,12 @@ import os.path
 import argparse
 import platformdirs
 from ai_tools_for_publishing.cli import set_up_and_run_application, VERBOSITY
-from ai_tools_for_publishing.utils import dict_to_yaml_str
+from ai_tools_for_publishing import utils
 from ai_tools_for_publishing.reformat_text import (
     DEFAULT_CONFIG as REFORMAT_HTML_DEFAULT_CONFIG,
     FORMATS,
 )
 from .default_config import DEFAULT_CONFIG
-from .main import main
 
 # fmt: off
 # -----------------------------------------------------------------------------
@@ -27,15 +26,17 @@ CLI_CONFIG = {
     "log_level": "NONE",
     "log_max_bytes": 1000 * 1024,
     "log_max_files": 10,
+    "document_cache_file": os.path.join(platformdirs.user_cache_dir(PARENT_NAME), "documents.sqlite"),
+    "socket_file": os.path.join(platformdirs.user_cache_dir(PARENT_NAME), f"{APP_NAME}.socket"),
 }
 APP_CFG = REFORMAT_HTML_DEFAULT_CONFIG | DEFAULT_CONFIG | CLI_CONFIG
-APP_USAGE = f"""
+APP_USAGE = lambda: f"""
 default configuration:
 ---
-{dict_to_yaml_str(APP_CFG)}
+{utils.dict_to_yaml_str(APP_CFG)}
 """
 APP_CLI_ARGUMENTS = (
-(("input_files",                ),{ "nargs": "+",                "metavar": "input.[html|md]",   "help": "HTML or Markdown documents to be processed", }),
+(("input_files",                ),{ "nargs": "*",                "metavar": "input.[html|md]",   "help": "HTML or Markdown documents to be processed", }),
 (("-v",      "--verbosity",     ),{ "dest": "verbosity",         "action": "count",              "help": "set output verbosity (-v = WARNING, -vv = INFO, -vvv = DEBUG)", }),
 (("-q",      "--quiet",         ),{ "dest": "verbosity",         "action": "store_const", "const": -1, "help": "Do not output anything", }),
 (("-a",      "--allow-unknown", ),{ "dest": "allow_unknown",     "action": "store_true",         "help": "hyphenate even unknown words (Use with care!)", }),
@@ -45,9 +46,23 @@ APP_CLI_ARGUMENTS = (
 (("-O",      "--output-path",   ),{ "dest": "output_path",       "metavar": "PATH",              "help": "output directory for hyphenated HTML documents", }),
 (("--out",   "--output",        ),{ "dest": "output_path",                                       "help": argparse.SUPPRESS, }),
 (("--output-name",              ),{ "dest": "output_name",       "metavar": "PATTERN",           "help": "name for output files (Default: \"{name}_hyphenated.{ext}\")", }),
-(("--output-format",            ),{ "dest": "output_format",     "metavar": "FORMAT",            "help": f"format for output files ({ ', '.join(list(FORMATS.keys())) }) (Default: html)", }),
+(("--output-format",            ),{ "dest": "output_format",     "metavar": "FORMAT",            "help": f"format for output files, or a comma separated list of them ({ ', '.join(list(FORMATS.keys())) }) (Default: html)", }),
 (("--format", "--fmt"           ),{ "dest": "output_format",                                     "help": argparse.SUPPRESS, }),
+(("--parser",                   ),{ "dest": "parser",            "metavar": "PARSER", "choices": ("auto", "lxml", "html5lib", "html.parser"), "help": "HTML parser (auto, lxml, html5lib, html.parser) (Default: auto = lxml if installed)", }),
+(("-j",      "--jobs",          ),{ "dest": "jobs",              "metavar": "N", "type": int,    "help": "hyphenate N files in parallel (Default: 1)", }),
+(("--prefetch",                 ),{ "dest": "prefetch",          "metavar": "N", "type": int,    "help": f"read up to N files ahead and write in the background, 0 to not (Default: {APP_CFG['prefetch']})", }),
+(("-t",      "--threads",       ),{ "dest": "threads",           "metavar": "N", "type": int,    "help": "hyphenate words of a document in N parallel threads (Default: 1)", }),
+(("-s",      "--stream",        ),{ "dest": "stream",            "action": "store_true",         "help": "hyphenate HTML files in chunks without parsing them (HTML output only)", }),
+(("-i",      "--incremental",   ),{ "dest": "incremental",       "action": "store_true",         "help": "only hyphenate paragraphs that changed since the previous run", }),
+(("--cache-file",               ),{ "dest": "cache_file",        "metavar": "CACHE.sqlite",      "help": "keep hyphenated words in this cache file between runs", }),
+(("--no-cache",                 ),{ "dest": "no_cache",          "action": "store_true",         "help": "do not use the hyphenation cache", }),
+(("--document-cache",           ),{ "dest": "document_cache",    "action": "store_true",         "help": "keep parsed documents in a cache shared with reformat_text", }),
+(("--document-cache-file",      ),{ "dest": "document_cache_file", "metavar": "CACHE.sqlite",    "help": "file of the shared document cache", }),
+(("--serve",                    ),{ "dest": "serve",             "action": "store_true",         "help": "keep running and hyphenate documents sent with --client", }),
+(("--client",                   ),{ "dest": "client",            "action": "store_true",         "help": "send the documents to a server started with --serve", }),
+(("--socket-file",              ),{ "dest": "socket_file",       "metavar": "PATH",              "help": "socket of the hyphenation server", }),
 (("-o",      "--overwrite",     ),{ "dest": "overwrite",         "action": "store_true",         "help": "overwrite already existing files", }),
+(("--force",                    ),{ "dest": "force",             "action": "store_true",         "help": "hyphenate files even if they are up to date", }),
 (("--config",                   ),{ "dest": "config_file",       "metavar": "CONFIG.yaml",       "help": "read configuration from this file (YAML format)", }),
 (("--log-level",                ),{ "dest": "log_level",         "metavar": "LEVEL", "choices": VERBOSITY.keys(), "help": f"set logging level ({ ', '.join(list(VERBOSITY.keys())) }) (Default: {APP_CFG['log_level']})", }),
 (("--loglevel",                 ),{ "dest": "log_level",         "choices": VERBOSITY.keys(),    "help": argparse.SUPPRESS, }),
@@ -57,5 +72,17 @@ APP_CLI_ARGUMENTS = (
 
 # -----------------------------------------------------------------------------
 
+def run_main(cfg):
+    # Import the application only after the command line has been parsed
+    if cfg["client"]:
+        from .client import run_client
+        run_client(cfg)
+    elif cfg["serve"]:
+        from .server import run_server
+        run_server(cfg)
+    else:
+        from . import main
+        main(cfg)
+
 def cli():
-    set_up_and_run_application(APP_NAME, APP_DESCRIPTION, APP_USAGE, APP_CLI_ARGUMENTS, APP_CFG, main)
+    set_up_and_run_application(APP_NAME, APP_DESCRIPTION, APP_USAGE, APP_CLI_ARGUMENTS, APP_CFG, run_main)
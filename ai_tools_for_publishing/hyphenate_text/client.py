@@ -0,0 +1,75 @@
+import os.path
+import json
+import socket
+import logging
+from typing import Any, Dict
+from .unknown_words import print_unknown_words
+
+# Configuration that a client may set for its own request,
+# everything else is decided when the server is started
+CLIENT_CONFIG_KEYS = (
+    "output_path",
+    "output_name",
+    "output_format",
+    "overwrite",
+    "dry_run",
+    "stream",
+    "list_unknown",
+)
+
+
+def send_request(socket_file: str, request: Dict[str, Any]) -> Dict[str, Any]:
+    """Send a request to a hyphenation server and return its response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        try:
+            connection.connect(socket_file)
+        except (FileNotFoundError, ConnectionRefusedError):
+            raise ConnectionError(
+                f"No hyphenation server at '{socket_file}', start one with --serve"
+            )
+        connection.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with connection.makefile("rb") as responses:
+            line = responses.readline()
+
+    # The server closed the connection without responding, e.g. when it was stopped
+    if not line.strip():
+        raise ConnectionError(
+            f"No response from the hyphenation server at '{socket_file}'"
+        )
+
+    response = json.loads(line)
+
+    if "error" in response:
+        raise RuntimeError(response["error"])
+    return response
+
+
+def run_client(cfg: Dict[str, Any]) -> None:
+    """Have a running hyphenation server hyphenate the documents."""
+    log = logging.getLogger(__name__)
+
+    if not cfg["input_files"]:
+        raise ValueError("No input files")
+
+    # The server does not know our working directory
+    client_cfg = {key: cfg[key] for key in CLIENT_CONFIG_KEYS if key in cfg}
+    if client_cfg.get("output_path"):
+        client_cfg["output_path"] = os.path.abspath(client_cfg["output_path"])
+
+    log.info("Sending %s files to %s...", len(cfg["input_files"]), cfg["socket_file"])
+    response = send_request(
+        cfg["socket_file"],
+        {
+            "input_files": [os.path.abspath(file) for file in cfg["input_files"]],
+            "cfg": client_cfg,
+        },
+    )
+
+    # Errors of the files are logged by the server, report them here as well
+    for error in response.get("errors", []):
+        log.error(
+            error["message"], extra={"file": error["file"], "error": error["error"]}
+        )
+
+    if cfg["list_unknown"]:
+        print_unknown_words(response["unknown_words"])
@@ -1,3 +1,8 @@
+import os.path
+import platformdirs
+
+(PARENT_NAME, APP_NAME) = __package__.split(".")
+
 DEFAULT_CONFIG = {
     "min_word_length": 5,
     "allow_unknown": False,
@@ -5,4 +10,18 @@ DEFAULT_CONFIG = {
     "hyphenations_file": None,
     "output_name": "{name}_hyphenated{ext}",
     "output_format": "html",
+    "jobs": 1,
+    "threads": 1,
+    "stream": False,
+    "no_cache": False,
+    "cache_file": os.path.join(
+        platformdirs.user_cache_dir(PARENT_NAME), f"{APP_NAME}.sqlite"
+    ),
+    "cache_max_entries": 1000000,
+    "hyphenations_index_dir": os.path.join(
+        platformdirs.user_cache_dir(PARENT_NAME), "hyphenations"
+    ),
+    "incremental": False,
+    "serve": False,
+    "client": False,
 }
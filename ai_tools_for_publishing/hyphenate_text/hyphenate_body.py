@@ -1,72 +1,295 @@
 import re
 import logging
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Union, Any
 from bs4 import Tag
-from .voikko import get_voikko
-from ai_tools_for_publishing.utils import ALL_PUNCTUATION, split_punctuation_from_word
+from libvoikko import Voikko
+from .voikko import get_voikko, get_thread_voikko
+from .hyphenation_cache import HyphenationCache
+from .paragraph_store import ParagraphStore
+from ai_tools_for_publishing.utils import (
+    ALL_PUNCTUATION,
+    tokenize,
+    log_unknown_punctuation,
+)
+from ai_tools_for_publishing.reformat_text import CompactElement, find_strings
+
+# Voikko adds hyphenation after punctuation in multi-part words
+PUNCTUATION_HYPHEN_RE = re.compile(f"([{re.escape(ALL_PUNCTUATION)}])\N{SOFT HYPHEN}")
+
+# Splits a text into words while keeping the whitespace
+WHITESPACE_RE = re.compile(r"(\s+)")
+
+# Words that are never given to Voikko: numbers (or anything without letters) and URLs
+NOT_A_WORD_RE = re.compile(r"^[\W\d_]*$|://|^[Ww]{3}\.|@")
 
 voikko = None
+cache = None
+store = None
+min_word_length = 1
+executor = None
 
 
-def hyphenate_word(word: str, known_hyphenations: Dict[str, str]) -> str:
-    """Hyphenate a single word and return it."""
-    global voikko
-    log = logging.getLogger(__name__)
-
-    prefix, word, postfix = split_punctuation_from_word(word)
-    if word in known_hyphenations:
-        log.debug("Known word %s -> %s", word, known_hyphenations[word])
-        hyphenated_word = known_hyphenations[word].replace("_", "\N{SOFT HYPHEN}")
-    else:
-        hyphenated_word = voikko.hyphenate(word, separator="\N{SOFT HYPHEN}")
-        if not isinstance(hyphenated_word, str):
-            raise TypeError(f"Hyphenating '{word}' returned {hyphenated_word}")
-
-        # Voikko adds hyphenation after punctuation in multi-part words,
-        # let's remove it...
-        fixed_hyphenated_word = re.sub(
-            f"([{re.escape(ALL_PUNCTUATION)}])\N{SOFT HYPHEN}",
-            lambda m: m[1],
-            hyphenated_word,
+def hyphenate_with_voikko(word: str, voikko: Voikko) -> str:
+    """Hyphenate a single word with Voikko and return it."""
+
+    hyphenated_word = voikko.hyphenate(word, separator="\N{SOFT HYPHEN}")
+    if not isinstance(hyphenated_word, str):
+        raise TypeError(f"Hyphenating '{word}' returned {hyphenated_word}")
+
+    # Voikko adds hyphenation after punctuation in multi-part words,
+    # let's remove it...
+    fixed_hyphenated_word = PUNCTUATION_HYPHEN_RE.sub(r"\1", hyphenated_word)
+
+    if hyphenated_word != fixed_hyphenated_word:
+        log = logging.getLogger(__name__)
+        log.warning(
+            "Voikko hyphenation fixed",
+            extra={
+                "original": hyphenated_word.replace("\N{SOFT HYPHEN}", "_"),
+                "fixed": fixed_hyphenated_word.replace("\N{SOFT HYPHEN}", "_"),
+            },
         )
+        hyphenated_word = fixed_hyphenated_word
 
-        if hyphenated_word != fixed_hyphenated_word:
-            log.warning(
-                "Voikko hyphenation fixed",
-                extra={
-                    "original": hyphenated_word.replace("\N{SOFT HYPHEN}", "_"),
-                    "fixed": fixed_hyphenated_word.replace("\N{SOFT HYPHEN}", "_"),
-                },
-            )
-            hyphenated_word = fixed_hyphenated_word
+    return hyphenated_word
 
-    return prefix + hyphenated_word + postfix
 
+def look_up_word(word: str, known_hyphenations: Mapping[str, str]) -> Optional[str]:
+    """
+    Return the known or cached hyphenation of a word, or the word itself if
+    there is nothing to hyphenate. Return None if Voikko is needed.
+    """
+    global cache
+    global min_word_length
 
-def hyphenate_paragraph(sentence: str, known_hyphenations: Dict[str, str]) -> str:
-    """Hyphenate a single paragraph and return it."""
+    hyphenated_word = known_hyphenations.get(word)
+    if hyphenated_word is not None:
+        log = logging.getLogger(__name__)
+        log.debug("Known word %s -> %s", word, hyphenated_word)
+        return hyphenated_word
+    if len(word) < min_word_length or NOT_A_WORD_RE.search(word):
+        return word
+    if cache:
+        return cache.get(word)
+    return None
 
-    # We are preserving the original whitespace in the sentence:
-    old_words = re.split(r"(\s+)", sentence)
-    new_words = []
-    for word in old_words:
-        if word == "" or word.isspace():
-            new_words.append(word)
+
+def hyphenate_word(word: str, known_hyphenations: Mapping[str, str]) -> str:
+    """Hyphenate a single word (without surrounding punctuation) and return it."""
+    global voikko
+    global cache
+
+    hyphenated_word = look_up_word(word, known_hyphenations)
+    if hyphenated_word is None:
+        hyphenated_word = hyphenate_with_voikko(word, voikko)
+        if cache:
+            cache.set(word, hyphenated_word)
+
+    return hyphenated_word
+
+
+def hyphenate_words_in_threads(
+    words: Iterable[str], known_hyphenations: Mapping[str, str], cfg: Dict[str, Any]
+) -> Dict[str, str]:
+    """
+    Hyphenate words in a pool of threads, each of them having a Voikko of its own.
+    Known and cached words are looked up in the calling thread.
+    """
+    global cache
+    global executor
+
+    hyphenated_words = dict()
+    voikko_words = []
+    for word in words:
+        hyphenated_word = look_up_word(word, known_hyphenations)
+        if hyphenated_word is None:
+            voikko_words.append(word)
         else:
-            new_words.append(hyphenate_word(word, known_hyphenations))
-    return "".join(new_words)
+            hyphenated_words[word] = hyphenated_word
 
+    def hyphenate_chunk(chunk: List[str]) -> List[str]:
+        voikko = get_thread_voikko(cfg["allow_unknown"], cfg["min_word_length"])
+        return [hyphenate_with_voikko(word, voikko) for word in chunk]
 
-def hyphenate_body(
-    body: Tag, known_hyphenations: Dict[str, str], cfg: Dict[str, Any]
-) -> None:
-    """Hyphenate the text in-place in the <body> tag."""
+    # Voikko releases the GIL while hyphenating, so the threads run in parallel
+    chunk_size = len(voikko_words) // (cfg["threads"] * 4) + 1
+    chunks = [
+        voikko_words[i : i + chunk_size]
+        for i in range(0, len(voikko_words), chunk_size)
+    ]
+    for chunk, results in zip(chunks, executor.map(hyphenate_chunk, chunks)):
+        for word, hyphenated_word in zip(chunk, results):
+            hyphenated_words[word] = hyphenated_word
+            if cache:
+                cache.set(word, hyphenated_word)
+
+    return hyphenated_words
+
+
+def hyphenate_words(
+    words: Iterable[str], known_hyphenations: Mapping[str, str], cfg: Dict[str, Any]
+) -> Dict[str, str]:
+    """Hyphenate distinct words and return them as a dictionary."""
+    if cfg["threads"] > 1:
+        return hyphenate_words_in_threads(words, known_hyphenations, cfg)
+    return {word: hyphenate_word(word, known_hyphenations) for word in words}
+
+
+def hyphenate_paragraph(sentence: str, hyphenated_tokens: Dict[str, str]) -> str:
+    """Hyphenate a single paragraph using already hyphenated tokens and return it."""
+
+    # We are preserving the original whitespace in the sentence:
+    old_words = WHITESPACE_RE.split(sentence)
+    return "".join(map(hyphenated_tokens.get, old_words, old_words))
 
+
+def set_up_hyphenation(
+    cfg: Dict[str, Any],
+    hyphenation_cache: HyphenationCache = None,
+    paragraph_store: ParagraphStore = None,
+) -> None:
+    """
+    Set up Voikko, the cache and the paragraph store for hyphenating texts.
+    The pool of threads is created only once, so that its threads and their
+    Voikkos are kept from one document to the next.
+    """
     global voikko
+    global cache
+    global store
+    global min_word_length
+    global executor
     voikko = get_voikko(cfg["allow_unknown"], cfg["min_word_length"])
+    cache = hyphenation_cache
+    store = paragraph_store
+    min_word_length = cfg["min_word_length"]
+    if cfg["threads"] > 1 and executor is None:
+        executor = ThreadPoolExecutor(max_workers=cfg["threads"])
+
+
+def shut_down_hyphenation() -> None:
+    """Shut down the pool of threads at the end of the run."""
+    global executor
+    if executor:
+        executor.shutdown()
+        executor = None
+
+
+def hyphenate_texts(
+    texts: List[str],
+    known_hyphenations: Mapping[str, str],
+    cfg: Dict[str, Any],
+    hyphenated_tokens: Dict[str, str],
+) -> List[str]:
+    """
+    Hyphenate a batch of texts and return them.
+
+    The distinct tokens of all the texts are collected first and each distinct
+    word is hyphenated only once. New tokens are added to `hyphenated_tokens`.
+    Texts found in the paragraph store are not hyphenated again.
+    """
+    global store
+
+    def hyphenate_new_words(words: Iterable[str]) -> Dict[str, str]:
+        return hyphenate_words(words, known_hyphenations, cfg)
+
+    if not store:
+        return hyphenate_texts_with(texts, hyphenate_new_words, hyphenated_tokens)
+
+    # Only hyphenate the texts that have changed since the previous run
+    texts = [text.replace("\N{SOFT HYPHEN}", "") for text in texts]
+    stored_texts = [store.get(text) for text in texts]
+    changed_texts = [
+        text for text, stored_text in zip(texts, stored_texts) if stored_text is None
+    ]
+    hyphenated_texts = hyphenate_texts_with(
+        changed_texts, hyphenate_new_words, hyphenated_tokens
+    )
+    for text, hyphenated_text in zip(changed_texts, hyphenated_texts):
+        store.set(text, hyphenated_text)
+
+    hyphenated_texts = iter(hyphenated_texts)
+    return [
+        next(hyphenated_texts) if stored_text is None else stored_text
+        for stored_text in stored_texts
+    ]
+
+
+def hyphenate_texts_with(
+    texts: List[str],
+    hyphenate_new_words: Callable[[Iterable[str]], Dict[str, str]],
+    hyphenated_tokens: Dict[str, str],
+) -> List[str]:
+    """Hyphenate a batch of texts using a function that hyphenates new words."""
+
+    # Phase one: collect the distinct whitespace separated tokens
+    sentences = [text.replace("\N{SOFT HYPHEN}", "") for text in texts]
+    new_tokens = " ".join(
+        token
+        for token in dict.fromkeys(" ".join(sentences).split())
+        if token not in hyphenated_tokens
+    )
+    log_unknown_punctuation(new_tokens)
+
+    # Phase two: split them into punctuation and words in one go and hyphenate
+    # the new words. A word without punctuation is also a token of its own, so
+    # words and tokens can share the same dictionary.
+    split_tokens = tokenize(new_tokens)
+    new_words = dict.fromkeys(
+        word for _, _, word, _ in split_tokens if word not in hyphenated_tokens
+    )
+    hyphenated_tokens |= hyphenate_new_words(new_words)
+    for _, prefix, word, postfix in split_tokens:
+        hyphenated_tokens[prefix + word + postfix] = (
+            prefix + hyphenated_tokens[word] + postfix
+        )
+
+    # Phase three: rewrite the texts
+    return [hyphenate_paragraph(sentence, hyphenated_tokens) for sentence in sentences]
+
+
+def hyphenate_body(
+    body: Union[Tag, CompactElement],
+    known_hyphenations: Mapping[str, str],
+    cfg: Dict[str, Any],
+    hyphenation_cache: HyphenationCache = None,
+    hyphenated_tokens: Dict[str, str] = None,
+    paragraph_store: ParagraphStore = None,
+) -> None:
+    """
+    Hyphenate the text in-place in the <body> tag or the body of a compact
+    document.
+
+    Pass the same `hyphenated_tokens` dictionary for every document
+    to share the work across multiple documents.
+    """
+    set_up_hyphenation(cfg, hyphenation_cache, paragraph_store)
+    if hyphenated_tokens is None:
+        hyphenated_tokens = dict()
+
+    # The strings of a compact document are replaced in the lists they are in
+    if isinstance(body, CompactElement):
+        places = [
+            (children, index)
+            for children, index in find_strings(body)
+            if children[index] != "\n"
+        ]
+        texts = hyphenate_texts(
+            [str(children[index]) for children, index in places],
+            known_hyphenations,
+            cfg,
+            hyphenated_tokens,
+        )
+        for (children, index), text in zip(places, texts):
+            children[index] = text
+        return
 
-    for element in body.find_all(string=True):
-        if element == "\n":
-            continue
-        sentence = str(element).replace("\N{SOFT HYPHEN}", "")
-        element.replace_with(hyphenate_paragraph(sentence, known_hyphenations))
+    elements = [element for element in body.find_all(string=True) if element != "\n"]
+    texts = hyphenate_texts(
+        [str(element) for element in elements],
+        known_hyphenations,
+        cfg,
+        hyphenated_tokens,
+    )
+    for element, text in zip(elements, texts):
+        element.replace_with(text)
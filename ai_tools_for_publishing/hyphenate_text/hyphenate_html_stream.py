@@ -0,0 +1,181 @@
+import re
+import html
+import logging
+import itertools
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Tuple
+from ai_tools_for_publishing.utils import open_atomically
+from ai_tools_for_publishing.reformat_text import guess_encoding
+from .hyphenate_body import set_up_hyphenation, hyphenate_texts
+from .hyphenation_cache import HyphenationCache
+from .paragraph_store import ParagraphStore
+
+# How many characters to read, hyphenate and write at a time
+CHUNK_SIZE = 256 * 1024
+
+# Comments, declarations, processing instructions and tags
+MARKUP_RE = re.compile(
+    r"<!--.*?-->|<!(?!--)[^>]*>|<\?[^>]*>|</?[a-zA-Z](?:[^>\"']|\"[^\"]*\"|'[^']*')*>",
+    re.DOTALL,
+)
+MARKUP_START_RE = re.compile(r"<(?:[!?/a-zA-Z]|\Z)")
+TAG_NAME_RE = re.compile(r"<(/?)([a-zA-Z][^\s/>]*)")
+LAST_WHITESPACE_RE = re.compile(r"\s\S*\Z")
+
+# The content of these elements is not HTML and is passed as it is
+RAW_TEXT_ELEMENTS = ("script", "style")
+
+MARKUP = 0
+TEXT = 1
+
+
+def split_html_stream(chunks: Iterable[str]) -> Iterator[Tuple[int, str]]:
+    """
+    Split a stream of HTML into (MARKUP, piece) and (TEXT, piece) tuples.
+
+    Joining the pieces together gives back the original stream. Text pieces
+    are only split at whitespace, so that words and entities stay whole.
+    """
+    buffer = ""
+    raw_text_end = None
+    for chunk in itertools.chain(chunks, (None,)):
+        at_end = chunk is None
+        buffer += chunk or ""
+        position = 0
+        hold = len(buffer)
+
+        while position < len(buffer):
+
+            # Pass <script> and <style> content until its end tag
+            if raw_text_end:
+                match = raw_text_end.search(buffer, position)
+                if not match and not at_end:
+                    hold = max(position, len(buffer) - 16)
+                    yield MARKUP, buffer[position:hold]
+                    position = hold
+                    break
+                end = match.start() if match else len(buffer)
+                yield MARKUP, buffer[position:end]
+                position = end
+                raw_text_end = None
+                continue
+
+            # Find the next markup...
+            markup_start = MARKUP_START_RE.search(buffer, position)
+            if not markup_start:
+                break
+            match = MARKUP_RE.match(buffer, markup_start.start())
+
+            # ...that might not be complete yet
+            if not match:
+                if not at_end:
+                    hold = markup_start.start()
+                    break
+                yield TEXT, buffer[position : markup_start.start() + 1]
+                position = markup_start.start() + 1
+                continue
+
+            if position < match.start():
+                yield TEXT, buffer[position : match.start()]
+            yield MARKUP, match[0]
+            position = match.end()
+
+            tag_name = TAG_NAME_RE.match(match[0])
+            if (
+                tag_name
+                and not tag_name[1]
+                and not match[0].endswith("/>")
+                and tag_name[2].lower() in RAW_TEXT_ELEMENTS
+            ):
+                raw_text_end = re.compile(rf"</{tag_name[2]}[\s/>]", re.IGNORECASE)
+
+        # Do not split the last word of the text, unless there is no more text
+        if at_end:
+            hold = len(buffer)
+        elif hold == len(buffer):
+            last_whitespace = LAST_WHITESPACE_RE.search(buffer, position)
+            hold = last_whitespace.start() + 1 if last_whitespace else position
+        if position < hold:
+            yield TEXT, buffer[position:hold]
+            position = hold
+
+        buffer = buffer[position:]
+
+
+def hyphenate_html_stream(
+    input_file: str,
+    output_file: str,
+    known_hyphenations: Mapping[str, str],
+    cfg: Dict[str, Any],
+    hyphenation_cache: HyphenationCache = None,
+    hyphenated_tokens: Dict[str, str] = None,
+    paragraph_store: ParagraphStore = None,
+) -> None:
+    """
+    Hyphenate an HTML file into another without parsing it into a tree.
+
+    The file is read, hyphenated and written in chunks, so memory usage stays
+    the same regardless of its size. Markup is copied byte by byte, only the
+    text outside of <head>, <script> and <style> is hyphenated.
+    """
+    log = logging.getLogger(__name__)
+
+    set_up_hyphenation(cfg, hyphenation_cache, paragraph_store)
+    if hyphenated_tokens is None:
+        hyphenated_tokens = dict()
+
+    # Guess the encoding from the beginning of the file
+    with open(input_file, "rb") as file:
+        encoding = guess_encoding(file.read(CHUNK_SIZE)) or "utf-8"
+    log.debug("Guessed encoding for %s", input_file, extra={"encoding": encoding})
+
+    # The output is written to a temporary file first, so that half of it is never left
+    with (
+        open(input_file, encoding=encoding, newline="") as input,
+        open_atomically(
+            output_file,
+            "w",
+            encoding=encoding,
+            errors="xmlcharrefreplace",
+            newline="",
+        ) as output,
+    ):
+        pieces: List[Tuple[int, str]] = []
+        pieces_length = 0
+        in_head = False
+
+        def write_pieces() -> None:
+            texts = hyphenate_texts(
+                [html.unescape(piece) for kind, piece in pieces if kind == TEXT],
+                known_hyphenations,
+                cfg,
+                hyphenated_tokens,
+            )
+            texts = iter(texts)
+            output.write(
+                "".join(
+                    html.escape(next(texts), quote=False) if kind == TEXT else piece
+                    for kind, piece in pieces
+                )
+            )
+
+        chunks = iter(lambda: input.read(CHUNK_SIZE), "")
+        for kind, piece in split_html_stream(chunks):
+
+            # Leave the text in <head> alone
+            if kind == MARKUP and (tag_name := TAG_NAME_RE.match(piece)):
+                name = tag_name[2].lower()
+                if name == "head":
+                    in_head = not tag_name[1]
+                elif name == "body":
+                    in_head = False
+            elif kind == TEXT and in_head:
+                kind = MARKUP
+
+            pieces.append((kind, piece))
+            pieces_length += len(piece)
+            if pieces_length >= CHUNK_SIZE:
+                write_pieces()
+                pieces = []
+                pieces_length = 0
+
+        write_pieces()
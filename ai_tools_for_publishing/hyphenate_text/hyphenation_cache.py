@@ -0,0 +1,118 @@
+import os.path
+import time
+import pathlib
+import sqlite3
+import logging
+from typing import Dict, Optional, Set
+
+
+class HyphenationCache:
+    """
+    Persistent cache of words hyphenated by Voikko.
+
+    Hyphenations are stored in an SQLite database and keyed by the Voikko
+    version and the settings that affect hyphenation, so changing either one
+    starts a fresh set of entries. When the cache grows beyond `max_entries`,
+    the least recently used words are evicted.
+    """
+
+    def __init__(self, cache_file: str, settings: str, max_entries: int) -> None:
+        log = logging.getLogger(__name__)
+
+        # Try to create the cache dir
+        cache_dir, _ = os.path.split(cache_file)
+        if cache_dir:
+            pathlib.Path(cache_dir).mkdir(parents=True, exist_ok=True)
+
+        log.info("Opening hyphenation cache %s...", cache_file)
+        self.connection = sqlite3.connect(cache_file, timeout=60)
+        self.connection.execute(
+            """CREATE TABLE IF NOT EXISTS hyphenations (
+                settings TEXT NOT NULL,
+                word TEXT NOT NULL,
+                hyphenated TEXT NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (settings, word)
+            )"""
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS last_used_index ON hyphenations (last_used)"
+        )
+        self.cache_file = cache_file
+        self.settings = settings
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.misses = 0
+        self.words: Dict[str, str] = dict()  # Words seen during this run
+        self.new_words: Dict[str, str] = dict()  # Not yet in the database
+        self.used_words: Set[str] = set()  # Found from the database
+
+    def __enter__(self) -> "HyphenationCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def get(self, word: str) -> Optional[str]:
+        """Return the cached hyphenation of a word, or None if not found."""
+        hyphenated_word = self.words.get(word)
+        if hyphenated_word is None:
+            row = self.connection.execute(
+                "SELECT hyphenated FROM hyphenations WHERE settings = ? AND word = ?",
+                (self.settings, word),
+            ).fetchone()
+            if row is not None:
+                hyphenated_word = self.words[word] = row[0]
+                self.used_words.add(word)
+
+        if hyphenated_word is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return hyphenated_word
+
+    def set(self, word: str, hyphenated_word: str) -> None:
+        """Add a hyphenated word to the cache."""
+        self.words[word] = hyphenated_word
+        self.new_words[word] = hyphenated_word
+
+    def flush(self) -> None:
+        """Write new words to the database and evict the least recently used ones."""
+        now = time.time()
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO hyphenations VALUES (?, ?, ?, ?)",
+                ((self.settings, w, h, now) for w, h in self.new_words.items()),
+            )
+            self.connection.executemany(
+                "UPDATE hyphenations SET last_used = ? WHERE settings = ? AND word = ?",
+                ((now, self.settings, w) for w in self.used_words),
+            )
+            (entries,) = self.connection.execute(
+                "SELECT COUNT(*) FROM hyphenations"
+            ).fetchone()
+            if entries > self.max_entries:
+                self.connection.execute(
+                    """DELETE FROM hyphenations WHERE rowid IN (
+                        SELECT rowid FROM hyphenations
+                        ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                    )""",
+                    (self.max_entries,),
+                )
+        self.new_words.clear()
+        self.used_words.clear()
+
+    def close(self) -> None:
+        """Flush the cache, log the statistics and close the database."""
+        log = logging.getLogger(__name__)
+        self.flush()
+        log.info(
+            "Hyphenation cache statistics",
+            extra={
+                "file": self.cache_file,
+                "hits": self.hits,
+                "misses": self.misses,
+            },
+        )
+        self.connection.close()
@@ -0,0 +1,86 @@
+import itertools
+import threading
+from typing import Any, Dict, Iterable, Iterator, List
+from libvoikko import Voikko
+from .default_config import DEFAULT_CONFIG
+from .voikko import create_voikko
+from .known_hyphenations import KnownHyphenations
+from .hyphenate_body import NOT_A_WORD_RE, hyphenate_with_voikko, hyphenate_texts_with
+
+# How many texts hyphenate_many() hyphenates at a time
+BATCH_SIZE = 10000
+
+
+class Hyphenator:
+    """
+    Hyphenate Finnish texts in memory, without documents or soups.
+
+    A hyphenator holds its own known hyphenations, a Voikko for each thread
+    that uses it and a table of words it has already hyphenated, so the same
+    hyphenator can be shared by a pool of threads. The configuration is the
+    same as on the command line, for example:
+
+        hyphenator = Hyphenator({"hyphenations_file": "hyphenations.yaml"})
+        hyphenator.hyphenate("Kirjoittaja kirjoittaa.")
+    """
+
+    def __init__(self, cfg: Dict[str, Any] = None) -> None:
+        self.cfg = DEFAULT_CONFIG | (cfg or dict())
+
+        self.known_hyphenations = dict()
+        if self.cfg["hyphenations_file"]:
+            self.known_hyphenations = KnownHyphenations(
+                self.cfg["hyphenations_file"], self.cfg["hyphenations_index_dir"]
+            )
+
+        self.hyphenated_tokens: Dict[str, str] = dict()
+        self.thread_local = threading.local()
+
+    def get_voikko(self) -> Voikko:
+        """Return the Voikko of the current thread."""
+        if not hasattr(self.thread_local, "voikko"):
+            voikko = create_voikko()
+            voikko.setHyphenateUnknownWords(self.cfg["allow_unknown"])
+            voikko.setMinHyphenatedWordLength(self.cfg["min_word_length"])
+            voikko.setNoUglyHyphenation(True)
+            self.thread_local.voikko = voikko
+        return self.thread_local.voikko
+
+    def hyphenate_words(self, words: Iterable[str]) -> Dict[str, str]:
+        """Hyphenate distinct words and return them as a dictionary."""
+        voikko = self.get_voikko()
+        min_word_length = self.cfg["min_word_length"]
+
+        hyphenated_words = dict()
+        for word in words:
+            hyphenated_word = self.known_hyphenations.get(word)
+            if hyphenated_word is None:
+                if len(word) < min_word_length or NOT_A_WORD_RE.search(word):
+                    hyphenated_word = word
+                else:
+                    hyphenated_word = hyphenate_with_voikko(word, voikko)
+            hyphenated_words[word] = hyphenated_word
+        return hyphenated_words
+
+    def hyphenate_batch(self, texts: List[str]) -> List[str]:
+        """Hyphenate a list of texts and return them."""
+
+        # Start over instead of growing forever. Other threads can safely
+        # keep using the old table until they are done.
+        if len(self.hyphenated_tokens) > self.cfg["cache_max_entries"]:
+            self.hyphenated_tokens = dict()
+
+        return hyphenate_texts_with(texts, self.hyphenate_words, self.hyphenated_tokens)
+
+    def hyphenate(self, text: str) -> str:
+        """Hyphenate a text and return it."""
+        return self.hyphenate_batch([text])[0]
+
+    def hyphenate_many(self, texts: Iterable[str]) -> Iterator[str]:
+        """
+        Hyphenate texts and yield them in the same order. The texts are
+        hyphenated in batches, so there can be any number of them.
+        """
+        texts = iter(texts)
+        while batch := list(itertools.islice(texts, BATCH_SIZE)):
+            yield from self.hyphenate_batch(batch)
@@ -0,0 +1,183 @@
+import os
+import sys
+import mmap
+import array
+import struct
+import hashlib
+import pathlib
+import tempfile
+import logging
+from typing import Optional
+from ai_tools_for_publishing.utils import read_yaml_file_to_dict
+
+# Index files are machine-local, so offsets are stored in native byte order
+MAGIC = b"HYPHIDX1" + sys.byteorder[0].encode("ascii")
+
+# Magic, size, modification time and SHA-256 of the YAML file, number of words
+HEADER = struct.Struct("=9sQq32sQ")
+OFFSET_SIZE = array.array("I").itemsize
+
+
+class KnownHyphenations:
+    """
+    Read-only mapping of known hyphenations, compiled from a YAML file.
+
+    The YAML file is compiled into an index of words sorted by their UTF-8
+    bytes, with soft hyphens already substituted for underscores. The index is
+    memory-mapped and searched with binary search, so opening it does not load
+    anything into Python objects. It is rebuilt when the size, modification
+    time and content hash of the YAML file no longer match.
+    """
+
+    def __init__(self, hyphenations_file: str, index_dir: str) -> None:
+        log = logging.getLogger(__name__)
+
+        self.hyphenations_file = hyphenations_file
+        self.index_dir = index_dir
+        self.index_file = os.path.join(
+            index_dir,
+            hashlib.sha1(os.path.abspath(hyphenations_file).encode()).hexdigest()
+            + ".index",
+        )
+
+        if not self.open_index():
+            log.info(
+                "Compiling known hyphenations from %s to %s...",
+                hyphenations_file,
+                self.index_file,
+            )
+            self.compile_index()
+            if not self.open_index():
+                raise RuntimeError(f"Could not compile '{hyphenations_file}'")
+
+        log.debug(
+            "Opened known hyphenations index %s",
+            self.index_file,
+            extra={"words": self.length},
+        )
+
+    def __getstate__(self) -> dict:
+        # Memory maps cannot be pickled, so worker processes reopen the index
+        return {
+            "hyphenations_file": self.hyphenations_file,
+            "index_dir": self.index_dir,
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["hyphenations_file"], state["index_dir"])
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __contains__(self, word: str) -> bool:
+        return self.get(word) is not None
+
+    def __getitem__(self, word: str) -> str:
+        hyphenated_word = self.get(word)
+        if hyphenated_word is None:
+            raise KeyError(word)
+        return hyphenated_word
+
+    def get(self, word: str, default: Optional[str] = None) -> Optional[str]:
+        """Return the known hyphenation of a word, or `default` if not found."""
+        key = word.encode("utf-8", "surrogatepass")
+        data = self.data
+        offsets = self.offsets
+
+        # Word i is data[offsets[2i]:offsets[2i+1]], followed by its hyphenation
+        low, high = 0, self.length
+        while low < high:
+            middle = (low + high) // 2
+            if data[offsets[2 * middle] : offsets[2 * middle + 1]] < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.length and data[offsets[2 * low] : offsets[2 * low + 1]] == key:
+            return str(data[offsets[2 * low + 1] : offsets[2 * low + 2]], "utf-8")
+        return default
+
+    def open_index(self) -> bool:
+        """Map the index file to memory if it is up to date. Return success."""
+        try:
+            source = os.stat(self.hyphenations_file)
+            with open(self.index_file, "rb") as file:
+                index = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return False
+
+        if len(index) < HEADER.size:
+            index.close()
+            return False
+        magic, size, mtime, digest, length = HEADER.unpack_from(index)
+        if magic != MAGIC or size != source.st_size:
+            index.close()
+            return False
+
+        # A touched but otherwise unchanged file does not need to be recompiled
+        if mtime != source.st_mtime_ns:
+            if digest != self.hash_source():
+                index.close()
+                return False
+            with open(self.index_file, "r+b") as file:
+                file.write(HEADER.pack(MAGIC, size, source.st_mtime_ns, digest, length))
+
+        offsets_end = HEADER.size + (2 * length + 1) * OFFSET_SIZE
+        if len(index) < offsets_end:
+            index.close()
+            return False
+        self.length = length
+        self.digest = digest
+        self.offsets = memoryview(index)[HEADER.size : offsets_end].cast("I")
+        self.data = index
+        return True
+
+    def compile_index(self) -> None:
+        """Read the YAML file and write it into an index file."""
+        source = os.stat(self.hyphenations_file)
+        digest = self.hash_source()
+        hyphenations = read_yaml_file_to_dict(self.hyphenations_file)
+
+        # Sort by the encoded words, because that is how they are searched
+        entries = sorted(
+            (
+                str(word).encode("utf-8", "surrogatepass"),
+                str(hyphenated_word)
+                .replace("_", "\N{SOFT HYPHEN}")
+                .encode("utf-8", "surrogatepass"),
+            )
+            for word, hyphenated_word in hyphenations.items()
+        )
+
+        # Offsets are from the beginning of the file, the words come after them
+        offsets = array.array("I", [HEADER.size + (2 * len(entries) + 1) * OFFSET_SIZE])
+        for word, hyphenated_word in entries:
+            offsets.append(offsets[-1] + len(word))
+            offsets.append(offsets[-1] + len(hyphenated_word))
+
+        # Write to a temporary file first, so that readers never see half of it
+        pathlib.Path(self.index_dir).mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=self.index_dir, delete=False) as file:
+            try:
+                file.write(
+                    HEADER.pack(
+                        MAGIC, source.st_size, source.st_mtime_ns, digest, len(entries)
+                    )
+                )
+                file.write(offsets.tobytes())
+                for word, hyphenated_word in entries:
+                    file.write(word)
+                    file.write(hyphenated_word)
+                file.close()
+                os.replace(file.name, self.index_file)
+            except BaseException:
+                file.close()
+                os.unlink(file.name)
+                raise
+
+    def hash_source(self) -> bytes:
+        """Return the SHA-256 digest of the YAML file."""
+        sha256 = hashlib.sha256()
+        with open(self.hyphenations_file, "rb") as file:
+            for block in iter(lambda: file.read(1024 * 1024), b""):
+                sha256.update(block)
+        return sha256.digest()
@@ -1,53 +1,70 @@
 import re
-import yaml
-from typing import Dict, Any
+from collections import Counter
+from typing import Any, Dict, Mapping, Optional, Union
 from bs4 import Tag
 from .voikko import get_voikko, get_strict_voikko
-from ai_tools_for_publishing.utils import ALL_PUNCTUATION, split_punctuation_from_word
+from ai_tools_for_publishing.utils import ALL_PUNCTUATION, tokenize
+from ai_tools_for_publishing.reformat_text import CompactElement, find_strings
 
-# Dictionary of unknown words and their (guessed) hyphenated forms
-unknown_words: Dict[str, str] = dict()
+# Voikko's guesses for the words analysed by this process, None if known
+analysed_words: Dict[str, Optional[str]] = dict()
 
+PUNCTUATION_HYPHEN_RE = re.compile(f"([{re.escape(ALL_PUNCTUATION)}])_")
 
-def collect_unknown_words(body: Tag) -> None:
-    """Detect words that Voikko does not recognize
-    and add them to the dictionary of unknown words.
+
+def guess_unknown_word(word: str) -> Optional[str]:
+    """
+    Return the guessed hyphenation of a word Voikko does not recognize,
+    or None if Voikko recognizes it. Each word is analysed only once.
     """
-    global unknown_words
+    global analysed_words
 
-    voikko = get_voikko()
-    strict_voikko = get_strict_voikko()
+    if word not in analysed_words:
+        voikko = get_voikko()
+        strict_voikko = get_strict_voikko()
 
-    for element in body.find_all(string=True):
-        if element == "\n":
-            continue
+        hyphenated_word = None
+        if not strict_voikko.getHyphenationPattern(word).split():
+            hyphenated_word = voikko.hyphenate(word, separator="_")
 
-        words = str(element).split()
-        for word in words:
-            word = split_punctuation_from_word(word)[1]
+            # Voikko adds hyphenation after punctuation in multi-part words,
+            # let's remove it...
+            hyphenated_word = PUNCTUATION_HYPHEN_RE.sub(r"\1", hyphenated_word)
 
-            if len(word) < 5:
-                continue
+        analysed_words[word] = hyphenated_word
 
-            pattern = strict_voikko.getHyphenationPattern(word).split()
-            if not pattern and word not in unknown_words:
-                hyphenated_word = voikko.hyphenate(word, separator="_")
+    return analysed_words[word]
 
-                # Voikko adds hyphenation after punctuation in multi-part words,
-                # let's remove it...
-                hyphenated_word = re.sub(
-                    f"([{re.escape(ALL_PUNCTUATION)}])_",
-                    lambda m: m[1],
-                    hyphenated_word,
-                )
 
-                unknown_words[word] = hyphenated_word
+def collect_unknown_words(
+    body: Union[Tag, CompactElement],
+    input_file: str,
+    known_hyphenations: Mapping[str, str],
+    cfg: Dict[str, Any],
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Detect words of a document that Voikko does not recognize and return a
+    dictionary of them, their (guessed) hyphenated forms, occurrence counts
+    and the file name. Words with known hyphenations are skipped.
+    """
+    if isinstance(body, CompactElement):
+        strings = [children[index] for children, index in find_strings(body)]
+    else:
+        strings = body.find_all(string=True)
+    text = " ".join(strings).replace("\N{SOFT HYPHEN}", "")
+    word_counts = Counter(word for _, _, word, _ in tokenize(text))
+
+    unknown_words = dict()
+    for word, count in word_counts.items():
+        if len(word) < cfg["min_word_length"] or word in known_hyphenations:
+            continue
 
+        hyphenated_word = guess_unknown_word(word)
+        if hyphenated_word is not None:
+            unknown_words[word] = {
+                "hyphenated": hyphenated_word,
+                "count": count,
+                "files": [input_file],
+            }
 
-def print_unknown_words() -> None:
-    """Print the dictionary of unknown words
-    and their hyphenated forms in YAML format."""
-    global unknown_words
-    print(
-        yaml.dump(unknown_words, allow_unicode=True, default_flow_style=False), end=""
-    )
+    return unknown_words
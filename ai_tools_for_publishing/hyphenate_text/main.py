@@ -1,15 +1,38 @@
 import os.path
-from typing import Any, Dict
+from typing import Any, Dict, Mapping, Optional, Tuple
 import logging
 from bs4 import BeautifulSoup
+from ai_tools_for_publishing.cli import map_in_processes, map_in_pipeline
 from ai_tools_for_publishing.reformat_text import (
-    read_file_to_soup,
+    FORMATS,
+    Document,
+    read_file_to_document,
+    get_parser,
     get_body_from_soup,
     write_soup_to_file,
+    get_output_file_name,
+    may_write_to_file,
+    match_str_to_formats,
+    get_shared_templating_variables,
+    set_shared_templating_variables,
+    open_build_manifest,
+    get_files_to_build,
+    DocumentCache,
+    open_document_cache,
 )
-from ai_tools_for_publishing.utils import read_yaml_file_to_dict
-from .list_unknown_words import collect_unknown_words, print_unknown_words
-from .hyphenate_body import hyphenate_body
+from .list_unknown_words import collect_unknown_words
+from .unknown_words import merge_unknown_words, print_unknown_words
+from .hyphenate_body import hyphenate_body, shut_down_hyphenation
+from .hyphenate_html_stream import hyphenate_html_stream
+from .hyphenation_cache import HyphenationCache
+from .known_hyphenations import KnownHyphenations
+from .paragraph_store import ParagraphStore
+from .voikko import get_voikko_version
+
+# State of a worker process when hyphenating in parallel
+worker_known_hyphenations: Mapping[str, str] = None
+worker_hyphenated_tokens: Dict[str, str] = None
+worker_cfg: Dict[str, Any] = None
 
 
 def main(cfg: Dict[str, Any]) -> None:
@@ -20,51 +43,329 @@ def main(cfg: Dict[str, Any]) -> None:
     input_files = cfg.get("input_files")
     output_path = cfg.get("output_path")
 
+    if not input_files:
+        raise ValueError("No input files")
+
     # If the output path is set, make sure it is a directory
     if output_path:
         if not os.path.isdir(output_path):
             raise FileNotFoundError(f"'{output_path}' is not a directory")
         log.info("Writing to directory %s...", output_path)
 
-    # If we have a file of known hyphenations, load it
+    # Streaming does not build a tree that could be reformatted
+    if cfg["stream"] and list(match_str_to_formats(cfg["output_format"])) != ["html"]:
+        raise ValueError("Only HTML output format can be used when streaming")
+
+    # If we have a file of known hyphenations, open its (re)compiled index
     known_hyphenations = dict()
     if cfg["hyphenations_file"]:
-        known_hyphenations = read_yaml_file_to_dict(cfg["hyphenations_file"])
-        log.debug(
-            "Loaded known hyphenations from %s",
+        known_hyphenations = KnownHyphenations(
+            cfg["hyphenations_file"], cfg["hyphenations_index_dir"]
+        )
+        log.info(
+            "Loaded %s known hyphenations from %s",
+            len(known_hyphenations),
             cfg["hyphenations_file"],
-            extra={"hyphenations": known_hyphenations},
         )
 
-    # The main loop
-    for input_file in input_files:
+    # Skip the files and the formats whose outputs are up to date, unless only
+    # listing unknown words
+    manifest = None
+    if not cfg["list_unknown"]:
+        manifest = open_build_manifest(
+            "hyphenate_text", get_build_settings(known_hyphenations, cfg), cfg
+        )
+        input_files = get_files_to_build(input_files, manifest, cfg)
+        cfg = cfg | {"up_to_date_outputs": manifest.up_to_date_outputs}
+
+    # Unknown words, their (guessed) hyphenated forms, counts and files
+    unknown_words = dict()
+
+    # Process the files one by one...
+    if cfg["jobs"] <= 1:
+        cache = open_hyphenation_cache(cfg)
+        document_cache = open_document_cache(cfg)
+
+        # Each distinct word is hyphenated only once during the whole run
+        hyphenated_tokens = dict()
+
+        # The main loop, reading the next files ahead and writing in the background
+        for file_unknown_words in map_in_pipeline(
+            lambda input_file: read_file_to_hyphenate(input_file, cfg, document_cache),
+            lambda input_file, document: hyphenate_document(
+                input_file, document, known_hyphenations, cache, hyphenated_tokens, cfg
+            ),
+            lambda input_file, hyphenated: write_hyphenated_document(
+                input_file, hyphenated, cfg
+            ),
+            input_files,
+            cfg["prefetch"],
+        ):
+            merge_unknown_words(unknown_words, file_unknown_words)
+
+        # Store the newly hyphenated words for the next run
+        if cache:
+            cache.close()
+        if document_cache:
+            document_cache.close()
+        shut_down_hyphenation()
+
+    # ...or in parallel
+    else:
+        log.info("Hyphenating with %s parallel jobs...", cfg["jobs"])
+        for file_unknown_words in map_in_processes(
+            hyphenate_file_in_worker,
+            input_files,
+            cfg["jobs"],
+            initializer=set_up_worker,
+            initargs=(
+                known_hyphenations,
+                cfg,
+                get_shared_templating_variables(cfg),
+            ),
+        ):
+            merge_unknown_words(unknown_words, file_unknown_words)
+
+    # Record the files that were written for the next run
+    if manifest and not cfg["dry_run"]:
+        manifest.close()
+
+    # If we were collecting unknown words, print them to STDOUT
+    if cfg["list_unknown"]:
+        print_unknown_words(unknown_words)
+
+
+def open_hyphenation_cache(cfg: Dict[str, Any]) -> Optional[HyphenationCache]:
+    """Open the cache of already hyphenated words, unless told otherwise."""
+    if cfg["no_cache"] or cfg["list_unknown"]:
+        return None
+
+    return HyphenationCache(
+        cfg["cache_file"], get_hyphenation_settings(cfg), cfg["cache_max_entries"]
+    )
+
+
+def open_paragraph_store(
+    output_file: str, known_hyphenations: Mapping[str, str], cfg: Dict[str, Any]
+) -> Optional[ParagraphStore]:
+    """Open the paragraph store next to the output file, if hyphenating incrementally."""
+    if not cfg["incremental"] or cfg["dry_run"]:
+        return None
+
+    known_digest = None
+    if isinstance(known_hyphenations, KnownHyphenations):
+        known_digest = known_hyphenations.digest.hex()
+
+    return ParagraphStore(
+        f"{output_file}.paragraphs.json",
+        f"{get_hyphenation_settings(cfg)}; known_hyphenations={known_digest}",
+    )
+
+
+def get_build_settings(
+    known_hyphenations: Mapping[str, str], cfg: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Return the settings that affect the output files, for the build manifest."""
+    known_digest = None
+    if isinstance(known_hyphenations, KnownHyphenations):
+        known_digest = known_hyphenations.digest.hex()
+
+    return {
+        "hyphenation": get_hyphenation_settings(cfg),
+        "known_hyphenations": known_digest,
+        "parser": get_parser(cfg["parser"]),
+        "stream": cfg["stream"],
+    }
+
 
-        # Read the file into a BeautifulSoup object and find the body
+def get_hyphenation_settings(cfg: Dict[str, Any]) -> str:
+    """Return a string identifying Voikko and the settings that affect hyphenation."""
+    return (
+        f"{get_voikko_version()}"
+        f"; allow_unknown={bool(cfg['allow_unknown'])}"
+        f"; min_word_length={cfg['min_word_length']}"
+        "; no_ugly_hyphenation=True"
+    )
+
+
+def hyphenate_file(
+    input_file: str,
+    known_hyphenations: Mapping[str, str],
+    cache: Optional[HyphenationCache],
+    hyphenated_tokens: Dict[str, str],
+    cfg: Dict[str, Any],
+    document_cache: Optional[DocumentCache] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Read an HTML or Markdown document (or load it from the document cache)
+    and hyphenate it. Return the unknown words if we are collecting them.
+    """
+    document = read_file_to_hyphenate(input_file, cfg, document_cache)
+    hyphenated = hyphenate_document(
+        input_file, document, known_hyphenations, cache, hyphenated_tokens, cfg
+    )
+    return write_hyphenated_document(input_file, hyphenated, cfg)
+
+
+def is_streamed(input_file: str, cfg: Dict[str, Any]) -> bool:
+    """Check if a file is hyphenated as a stream instead of reading it."""
+    _, file_extension = os.path.splitext(input_file)
+    return (
+        cfg["stream"]
+        and not cfg["list_unknown"]
+        and file_extension[1:2].lower() in ("h", "x")
+    )
+
+
+def read_file_to_hyphenate(
+    input_file: str,
+    cfg: Dict[str, Any],
+    document_cache: Optional[DocumentCache] = None,
+) -> Tuple[Optional[Document], Optional[str]]:
+    """
+    Read a file into a compact document (or soup), or load it from the
+    document cache. Return the document, which is None if the file is
+    hyphenated as a stream, and the error if the file could not be read.
+    The error is logged when the document is hyphenated, so that the errors
+    are in the order of the files even when they are read ahead.
+    """
+
+    # HTML files can be hyphenated without reading them into a BeautifulSoup
+    if is_streamed(input_file, cfg):
+        return None, None
+
+    # Read the file into a compact document (or soup) and find the body
+    try:
+        soup = read_file_to_document(input_file, cfg["parser"], document_cache)
+        get_body_from_soup(soup)
+    except Exception as error:
+        return None, str(error)
+
+    return soup, None
+
+
+def hyphenate_document(
+    input_file: str,
+    document: Tuple[Optional[Document], Optional[str]],
+    known_hyphenations: Mapping[str, str],
+    cache: Optional[HyphenationCache],
+    hyphenated_tokens: Dict[str, str],
+    cfg: Dict[str, Any],
+) -> Tuple[Optional[Document], Dict[str, Dict[str, Any]]]:
+    """
+    Hyphenate a document that has been read, or the file as a stream, or
+    log the error of reading it. Return the document to write, if there is
+    one, and the unknown words if we are collecting them.
+    """
+
+    log = logging.getLogger(__name__)
+    soup, error = document
+
+    # The file could not be read
+    if error:
+        log.error("Error while reading %s", input_file, extra={"error": error})
+        return None, dict()
+
+    # HTML files can be hyphenated without reading them into a BeautifulSoup
+    if is_streamed(input_file, cfg):
+        output_file = get_output_file_name(input_file, FORMATS["html"], cfg)
+        if may_write_to_file(output_file, FORMATS["html"], cfg):
+            log.info("Hyphenating %s as a stream...", input_file)
+            store = open_paragraph_store(output_file, known_hyphenations, cfg)
+            try:
+                hyphenate_html_stream(
+                    input_file,
+                    output_file,
+                    known_hyphenations,
+                    cfg,
+                    cache,
+                    hyphenated_tokens,
+                    store,
+                )
+            except Exception as error:
+                log.error(
+                    "Error while reading %s",
+                    input_file,
+                    extra={"error": str(error)},
+                )
+                return None, dict()
+            finally:
+                if store:
+                    store.close()
+            log.info("Hyphenated HTML file written to %s", output_file)
+        return None, dict()
+
+    body = get_body_from_soup(soup)
+
+    # If we are collecting unknown hyphenations, do that and return
+    if cfg["list_unknown"]:
+        log.info("Collecting unknown words from %s...", input_file)
+        return None, collect_unknown_words(body, input_file, known_hyphenations, cfg)
+
+    # Otherwise, hyphenate the body
+    else:
+        log.info("Hyphenating %s...", input_file)
+        store = None
+        if cfg["incremental"]:
+            # The paragraphs are stored next to the first output file
+            output_format = next(
+                iter(match_str_to_formats(cfg["output_format"]).values())
+            )
+            output_file = get_output_file_name(input_file, output_format, cfg)
+            store = open_paragraph_store(output_file, known_hyphenations, cfg)
         try:
-            soup = read_file_to_soup(input_file)
-            body = get_body_from_soup(soup)
-        except Exception as error:
-            log.error(
-                "Error while reading %s",
-                input_file,
-                extra={"error": str(error)},
+            hyphenate_body(
+                body, known_hyphenations, cfg, cache, hyphenated_tokens, store
             )
-            continue
+        finally:
+            if store:
+                store.close()
 
-        # If we are collecting unknown hyphenations, do that and continue
-        if cfg["list_unknown"]:
-            log.info("Collecting unknown words from %s...", input_file)
-            collect_unknown_words(body)
-            continue
+    return soup, dict()
 
-        # Otherwise, hyphenate the body
-        else:
-            log.info("Hyphenating %s...", input_file)
-            hyphenate_body(body, known_hyphenations, cfg)
 
-        # Write the soup to a file
+def write_hyphenated_document(
+    input_file: str,
+    hyphenated: Tuple[Optional[Document], Dict[str, Dict[str, Any]]],
+    cfg: Dict[str, Any],
+) -> Dict[str, Dict[str, Any]]:
+    """Write a hyphenated document, if there is one, and return the unknown words."""
+    soup, unknown_words = hyphenated
+    if soup is not None:
         write_soup_to_file(input_file, soup, cfg)
+    return unknown_words
 
-    # If we were collecting unknown words, print them to STDOUT
-    if cfg["list_unknown"]:
-        print_unknown_words()
+
+def set_up_worker(
+    known_hyphenations: Mapping[str, str],
+    cfg: Dict[str, Any],
+    shared_templating_variables: Dict[str, str],
+) -> None:
+    """Store the shared state of a worker process."""
+    global worker_known_hyphenations
+    global worker_hyphenated_tokens
+    global worker_cfg
+    worker_known_hyphenations = known_hyphenations
+    worker_hyphenated_tokens = dict()
+    worker_cfg = cfg
+    set_shared_templating_variables(shared_templating_variables)
+
+
+def hyphenate_file_in_worker(input_file: str) -> Dict[str, Dict[str, Any]]:
+    """Hyphenate a single document in a worker process."""
+    cache = open_hyphenation_cache(worker_cfg)
+    document_cache = open_document_cache(worker_cfg)
+    try:
+        return hyphenate_file(
+            input_file,
+            worker_known_hyphenations,
+            cache,
+            worker_hyphenated_tokens,
+            worker_cfg,
+            document_cache,
+        )
+    finally:
+        if cache:
+            cache.close()
+        if document_cache:
+            document_cache.close()
@@ -0,0 +1,109 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+from typing import Dict, Optional, Set
+
+
+class ParagraphStore:
+    """
+    Sidecar store of the hyphenated paragraphs of a single document.
+
+    Paragraphs are keyed by a hash of their content, so that paragraphs that
+    have not changed since the previous run can be copied from the store
+    instead of being hyphenated again. The store is keyed by the settings that
+    affect hyphenation as a whole, and only the paragraphs used during the
+    latest run are kept.
+    """
+
+    def __init__(self, store_file: str, settings: str) -> None:
+        log = logging.getLogger(__name__)
+
+        self.store_file = store_file
+        self.settings = settings
+        self.paragraphs: Dict[str, str] = dict()
+        self.used_paragraphs: Set[str] = set()
+        self.changed = False
+        self.hits = 0
+        self.misses = 0
+
+        try:
+            with open(store_file, encoding="utf-8") as file:
+                content = json.load(file)
+            if content["settings"] == settings:
+                self.paragraphs = content["paragraphs"]
+            else:
+                log.info("Hyphenation settings changed, ignoring %s", store_file)
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, TypeError) as error:
+            log.warning(
+                "Ignoring a broken paragraph store",
+                extra={"file": store_file, "error": str(error)},
+            )
+
+    def __enter__(self) -> "ParagraphStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @staticmethod
+    def get_key(paragraph: str) -> str:
+        """Return the key of a paragraph (without soft hyphens)."""
+        return hashlib.blake2b(
+            paragraph.encode("utf-8", "surrogatepass"), digest_size=16
+        ).hexdigest()
+
+    def get(self, paragraph: str) -> Optional[str]:
+        """Return the stored hyphenation of a paragraph, or None if not found."""
+        key = self.get_key(paragraph)
+        hyphenated_paragraph = self.paragraphs.get(key)
+        if hyphenated_paragraph is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.used_paragraphs.add(key)
+        return hyphenated_paragraph
+
+    def set(self, paragraph: str, hyphenated_paragraph: str) -> None:
+        """Add a hyphenated paragraph to the store."""
+        key = self.get_key(paragraph)
+        self.paragraphs[key] = hyphenated_paragraph
+        self.used_paragraphs.add(key)
+        self.changed = True
+
+    def close(self) -> None:
+        """Write the store if it has changed and log the statistics."""
+        log = logging.getLogger(__name__)
+
+        if self.changed or len(self.used_paragraphs) < len(self.paragraphs):
+            paragraphs = {key: self.paragraphs[key] for key in self.used_paragraphs}
+
+            # Write to a temporary file first, so that a broken store is never left
+            store_dir, _ = os.path.split(self.store_file)
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=store_dir or ".", delete=False
+            ) as file:
+                try:
+                    json.dump(
+                        {"settings": self.settings, "paragraphs": paragraphs},
+                        file,
+                        ensure_ascii=False,
+                    )
+                    file.close()
+                    os.replace(file.name, self.store_file)
+                except BaseException:
+                    file.close()
+                    os.unlink(file.name)
+                    raise
+
+        log.info(
+            "Paragraph store statistics",
+            extra={
+                "file": self.store_file,
+                "hits": self.hits,
+                "misses": self.misses,
+            },
+        )
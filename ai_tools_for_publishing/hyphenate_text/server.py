@@ -0,0 +1,190 @@
+import os
+import json
+import socket
+import pathlib
+import logging
+import socketserver
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from ai_tools_for_publishing.reformat_text import DocumentCache, open_document_cache
+from .client import CLIENT_CONFIG_KEYS
+from .hyphenate_body import (
+    set_up_hyphenation,
+    shut_down_hyphenation,
+    hyphenate_texts,
+)
+from .hyphenation_cache import HyphenationCache
+from .known_hyphenations import KnownHyphenations
+from .unknown_words import merge_unknown_words
+from .main import hyphenate_file, open_hyphenation_cache
+
+# State of the server, kept warm between requests
+server_cfg: Dict[str, Any] = None
+known_hyphenations: Mapping[str, str] = dict()
+known_hyphenations_stat: Optional[Tuple[int, int]] = None
+hyphenated_tokens: Dict[str, str] = dict()
+cache: Optional[HyphenationCache] = None
+document_cache: Optional[DocumentCache] = None
+
+
+class HyphenationRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Handle the requests of a client connection, one JSON object per line:
+
+        {"texts": ["...", ...]}
+            Hyphenate plain texts and respond with {"texts": ["...", ...]}
+
+        {"input_files": ["/path/to/file.html", ...], "cfg": {...}}
+            Hyphenate documents like the command line would and respond with
+            {"unknown_words": {...}, "errors": [...]}. The errors are those
+            logged for each file, such as files that could not be read, as
+            {"file": "...", "message": "...", "error": "..."}. Only the output
+            settings can be given.
+
+    Errors are responded with {"error": "..."}.
+    """
+
+    def handle(self) -> None:
+        log = logging.getLogger(__name__)
+
+        for line in self.rfile:
+            try:
+                response = handle_request(json.loads(line))
+            except Exception as error:
+                log.exception(error.__class__.__name__, extra={"problem": str(error)})
+                response = {"error": f"{error.__class__.__name__}: {error}"}
+            self.wfile.write(
+                json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n"
+            )
+
+
+class FileErrorCollector(logging.Handler):
+    """Collect the errors logged while hyphenating a file, for the client."""
+
+    def __init__(self, input_file: str, errors: List[Dict[str, Any]]) -> None:
+        super().__init__(logging.ERROR)
+        self.input_file = input_file
+        self.errors = errors
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.errors.append(
+            {
+                "file": self.input_file,
+                "message": record.getMessage(),
+                "error": getattr(record, "error", None),
+            }
+        )
+
+
+def refresh_known_hyphenations() -> None:
+    """(Re)open the known hyphenations if the file has changed."""
+    global known_hyphenations
+    global known_hyphenations_stat
+
+    if not server_cfg["hyphenations_file"]:
+        return
+
+    stat = os.stat(server_cfg["hyphenations_file"])
+    if (stat.st_size, stat.st_mtime_ns) != known_hyphenations_stat:
+        known_hyphenations = KnownHyphenations(
+            server_cfg["hyphenations_file"], server_cfg["hyphenations_index_dir"]
+        )
+        known_hyphenations_stat = (stat.st_size, stat.st_mtime_ns)
+
+        # Already hyphenated words may have used the old hyphenations
+        hyphenated_tokens.clear()
+
+
+def handle_request(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Hyphenate the texts or the files of a request and return the response."""
+    refresh_known_hyphenations()
+
+    # Do not let the table of hyphenated words grow forever
+    if len(hyphenated_tokens) > server_cfg["cache_max_entries"]:
+        hyphenated_tokens.clear()
+
+    try:
+        if "texts" in request:
+            set_up_hyphenation(server_cfg, cache)
+            texts = hyphenate_texts(
+                request["texts"], known_hyphenations, server_cfg, hyphenated_tokens
+            )
+            return {"texts": texts}
+
+        cfg = server_cfg | {
+            key: value
+            for key, value in request.get("cfg", dict()).items()
+            if key in CLIENT_CONFIG_KEYS
+        }
+        unknown_words = dict()
+        errors = []
+        logger = logging.getLogger("ai_tools_for_publishing")
+        for input_file in request["input_files"]:
+            collector = FileErrorCollector(input_file, errors)
+            logger.addHandler(collector)
+            try:
+                merge_unknown_words(
+                    unknown_words,
+                    hyphenate_file(
+                        input_file,
+                        known_hyphenations,
+                        cache,
+                        hyphenated_tokens,
+                        cfg,
+                        document_cache,
+                    ),
+                )
+            finally:
+                logger.removeHandler(collector)
+        return {"unknown_words": unknown_words, "errors": errors}
+
+    # Store the newly hyphenated words in case the server is stopped
+    finally:
+        if cache:
+            cache.flush()
+
+
+def run_server(cfg: Dict[str, Any]) -> None:
+    """Keep Voikko and the hyphenations warm and serve requests from a socket."""
+    global server_cfg
+    global cache
+    global document_cache
+
+    log = logging.getLogger(__name__)
+
+    socket_file = cfg["socket_file"]
+    socket_dir, _ = os.path.split(socket_file)
+    if socket_dir:
+        pathlib.Path(socket_dir).mkdir(mode=0o700, parents=True, exist_ok=True)
+
+    # Remove the socket of a server that is no longer running
+    if os.path.exists(socket_file):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            try:
+                connection.connect(socket_file)
+            except ConnectionRefusedError:
+                os.unlink(socket_file)
+            else:
+                raise RuntimeError(f"A server is already running at '{socket_file}'")
+
+    server_cfg = cfg | {"list_unknown": False}
+    refresh_known_hyphenations()
+    cache = open_hyphenation_cache(server_cfg)
+    document_cache = open_document_cache(server_cfg)
+    set_up_hyphenation(server_cfg, cache)
+
+    try:
+        with socketserver.UnixStreamServer(
+            socket_file, HyphenationRequestHandler
+        ) as server:
+            log.info("Serving hyphenation requests at %s...", socket_file)
+            server.serve_forever()
+    except KeyboardInterrupt:
+        log.info("Stopped serving hyphenation requests")
+    finally:
+        if os.path.exists(socket_file):
+            os.unlink(socket_file)
+        if cache:
+            cache.close()
+        if document_cache:
+            document_cache.close()
+        shut_down_hyphenation()
@@ -0,0 +1,43 @@
+import yaml
+import logging
+from typing import Any, Dict
+
+# Merging and printing unknown words needs neither Voikko nor the documents,
+# so the client can do it without importing them
+
+
+def merge_unknown_words(
+    unknown_words: Dict[str, Dict[str, Any]],
+    file_unknown_words: Dict[str, Dict[str, Any]],
+) -> None:
+    """Add the unknown words of one file to those of the others."""
+    for word, file_unknown_word in file_unknown_words.items():
+        unknown_word = unknown_words.get(word)
+        if unknown_word is None:
+            unknown_words[word] = file_unknown_word
+        else:
+            unknown_word["count"] += file_unknown_word["count"]
+            unknown_word["files"] += file_unknown_word["files"]
+
+
+def print_unknown_words(unknown_words: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Print the unknown words and their hyphenated forms in YAML format,
+    the most frequent words first. The occurrence counts and the files
+    of each word are printed as comments.
+    """
+    log = logging.getLogger(__name__)
+    log.info("Found %s unknown words", len(unknown_words))
+
+    for word, unknown_word in sorted(
+        unknown_words.items(), key=lambda item: (-item[1]["count"], item[0])
+    ):
+        print(
+            f"# {unknown_word['count']}: {', '.join(unknown_word['files'])}\n"
+            + yaml.dump(
+                {word: unknown_word["hyphenated"]},
+                allow_unicode=True,
+                default_flow_style=False,
+            ),
+            end="",
+        )
@@ -1,34 +1,67 @@
+import threading
 from libvoikko import Voikko
 
-try:
-    VOIKKO = Voikko("fi")
-    VOIKKO.setHyphenateUnknownWords(True)
-    VOIKKO.setMinHyphenatedWordLength(1)
-    VOIKKO.setNoUglyHyphenation(True)
-    STRICT_VOIKKO = Voikko("fi")
-    STRICT_VOIKKO.setHyphenateUnknownWords(False)
-    STRICT_VOIKKO.setMinHyphenatedWordLength(1)
-    STRICT_VOIKKO.setNoUglyHyphenation(False)
-except Exception:
-    raise Exception(
-        """Unable to launch Finnish language Voikko
+# Voikko instances are created when they are first needed,
+# so that each worker process gets instances of its own
+VOIKKO = None
+STRICT_VOIKKO = None
+
+# Voikko instances of worker threads
+thread_local = threading.local()
+
+
+def create_voikko() -> Voikko:
+    """Create a new Finnish language Voikko object."""
+    try:
+        return Voikko("fi")
+    except Exception:
+        raise Exception(
+            """Unable to launch Finnish language Voikko
 
 Please make sure that the libvoikko and the
 Finnish language dictionary have been installed:
 
     sudo apt install libvoikko1 voikko-fi\n"""
-    )
+        )
 
 
 def get_voikko(allow_unknown: bool = True, min_word_length: int = 1) -> Voikko:
     """Return a Voikko object with the specified settings."""
     global VOIKKO
+    if not VOIKKO:
+        VOIKKO = create_voikko()
     VOIKKO.setHyphenateUnknownWords(allow_unknown)
     VOIKKO.setMinHyphenatedWordLength(min_word_length)
     VOIKKO.setNoUglyHyphenation(True)
     return VOIKKO
 
 
+def get_thread_voikko(allow_unknown: bool = True, min_word_length: int = 1) -> Voikko:
+    """Return a Voikko object of the current thread with the specified settings."""
+    if not hasattr(thread_local, "voikko"):
+        thread_local.voikko = create_voikko()
+    thread_local.voikko.setHyphenateUnknownWords(allow_unknown)
+    thread_local.voikko.setMinHyphenatedWordLength(min_word_length)
+    thread_local.voikko.setNoUglyHyphenation(True)
+    return thread_local.voikko
+
+
 def get_strict_voikko() -> Voikko:
     """Return a Voikko object that does not hyphenate unknown words."""
+    global STRICT_VOIKKO
+    if not STRICT_VOIKKO:
+        STRICT_VOIKKO = create_voikko()
+        STRICT_VOIKKO.setHyphenateUnknownWords(False)
+        STRICT_VOIKKO.setMinHyphenatedWordLength(1)
+        STRICT_VOIKKO.setNoUglyHyphenation(False)
     return STRICT_VOIKKO
+
+
+def get_voikko_version() -> str:
+    """Return a string identifying the Voikko library and its Finnish dictionaries."""
+    dictionaries = sorted(
+        f"{d.language}-{d.variant}: {d.description}"
+        for d in Voikko.listDicts()
+        if d.language == "fi"
+    )
+    return f"libvoikko {Voikko.getVersion()} ({', '.join(dictionaries)})"
@@ -1,7 +1,30 @@
+from ai_tools_for_publishing.utils import lazy_imports
 from .default_config import DEFAULT_CONFIG
-from .formats import FORMATS
-from .main import main
+from .formats import FORMATS, match_str_to_format, match_str_to_formats
 from .cli import cli
-from .read_file_to_soup import read_file_to_soup
-from .get_body_from_soup import get_body_from_soup
-from .write_soup_to_file import write_soup_to_file
+
+# BeautifulSoup, markdown-it and the formatters are imported only when needed
+__getattr__ = lazy_imports(
+    __name__,
+    {
+        "main": ".main",
+        "read_file_to_soup": ".read_document",
+        "read_file_to_document": ".read_document",
+        "get_parser": ".read_document",
+        "Document": ".compact_document",
+        "CompactDocument": ".compact_document",
+        "CompactElement": ".compact_document",
+        "find_strings": ".compact_document",
+        "guess_encoding": ".read_html_file",
+        "get_body_from_soup": ".find_body",
+        "write_soup_to_file": ".write_document",
+        "get_output_file_name": ".write_document",
+        "may_write_to_file": ".write_document",
+        "get_shared_templating_variables": ".write_document",
+        "set_shared_templating_variables": ".write_document",
+        "open_build_manifest": ".build_manifest",
+        "DocumentCache": ".document_cache",
+        "open_document_cache": ".document_cache",
+        "get_files_to_build": ".build_manifest",
+    },
+)
@@ -0,0 +1,221 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+from typing import Any, Dict, List, Optional, Set
+from ai_tools_for_publishing.utils import get_tool_version
+from .formats import match_str_to_formats
+from .write_document import get_output_file_name, get_output_settings
+
+# Bump this when the format of the manifest changes
+MANIFEST_VERSION = 1
+
+
+def get_stat(file_name: str) -> Optional[List[int]]:
+    """Return the size and modification time of a file, or None if it does not exist."""
+    try:
+        stat = os.stat(file_name)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class BuildManifest:
+    """
+    Manifest of the output files in a directory, like the one make would need.
+
+    Each output file is recorded with a fingerprint of its input file, format
+    and settings (including the version of the tools and the settings of its
+    format, such as the template), and the size and time
+    of the output file when it was built. An input file whose outputs all
+    match is up to date and does not need to be read at all. The hashes of the
+    input files are kept too, and hashed again only when their size or time
+    has changed.
+    """
+
+    def __init__(
+        self,
+        manifest_file: str,
+        settings: Dict[str, Any],
+        format_settings: Dict[str, Dict[str, Any]] = None,
+    ) -> None:
+        log = logging.getLogger(__name__)
+
+        self.manifest_file = manifest_file
+        self.manifest_dir = os.path.dirname(manifest_file) or "."
+        settings = settings | {"version": get_tool_version()}
+        self.settings = json.dumps(settings, sort_keys=True)
+        self.format_settings = {
+            format_name: json.dumps(settings | {"format": value}, sort_keys=True)
+            for format_name, value in (format_settings or dict()).items()
+        }
+        self.inputs: Dict[str, Dict[str, Any]] = dict()
+        self.outputs: Dict[str, Dict[str, Any]] = dict()
+        self.pending: Dict[str, tuple] = dict()
+        self.up_to_date_outputs: Set[str] = set()
+        self.changed = False
+
+        try:
+            with open(manifest_file, encoding="utf-8") as file:
+                content = json.load(file)
+            if content["manifest_version"] == MANIFEST_VERSION:
+                self.inputs = content["inputs"]
+                self.outputs = content["outputs"]
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, TypeError) as error:
+            log.warning(
+                "Ignoring a broken build manifest",
+                extra={"file": manifest_file, "error": str(error)},
+            )
+
+    def get_key(self, file_name: str) -> str:
+        """Return the key of a file, relative to the manifest."""
+        return os.path.relpath(file_name, self.manifest_dir)
+
+    def get_input_hash(self, input_file: str) -> str:
+        """Return the hash of an input file, hashing it only if it has changed."""
+        key = self.get_key(input_file)
+        stat = get_stat(input_file)
+        if stat is None:
+            raise FileNotFoundError(input_file)
+
+        entry = self.inputs.get(key)
+        if entry and entry["stat"] == stat:
+            return entry["hash"]
+
+        digest = hashlib.blake2b(digest_size=16)
+        with open(input_file, "rb") as file:
+            while chunk := file.read(1024 * 1024):
+                digest.update(chunk)
+        self.inputs[key] = {"stat": stat, "hash": digest.hexdigest()}
+        self.changed = True
+        return self.inputs[key]["hash"]
+
+    def get_fingerprint(self, input_hash: str, format_name: str) -> str:
+        """Return the fingerprint of an output built from an input in a format."""
+        settings = self.format_settings.get(format_name, self.settings)
+        return hashlib.blake2b(
+            f"{input_hash}\n{format_name}\n{settings}".encode("utf-8"),
+            digest_size=16,
+        ).hexdigest()
+
+    def is_up_to_date(self, input_file: str, output_files: Dict[str, str]) -> bool:
+        """
+        Return True if the output files of each format were built from the
+        input file as it is now, with the same settings, and have not been
+        changed since. Those that are up to date are added to
+        `up_to_date_outputs`, and the output files are recorded again when
+        the manifest is closed, if they have been written by then.
+        """
+        try:
+            input_hash = self.get_input_hash(input_file)
+        except OSError:
+            return False
+
+        up_to_date = True
+        for format_name, output_file in output_files.items():
+            key = self.get_key(output_file)
+            fingerprint = self.get_fingerprint(input_hash, format_name)
+            stat = get_stat(output_file)
+            entry = self.outputs.get(key)
+            if (
+                stat is None
+                or not entry
+                or entry["fingerprint"] != fingerprint
+                or entry["stat"] != stat
+            ):
+                up_to_date = False
+            else:
+                self.up_to_date_outputs.add(output_file)
+            self.pending[key] = (output_file, fingerprint, stat)
+
+        return up_to_date
+
+    def record_outputs(self) -> None:
+        """Record the pending output files that have been written since they were checked."""
+        for key, (output_file, fingerprint, old_stat) in self.pending.items():
+            stat = get_stat(output_file)
+            if stat is not None and stat != old_stat:
+                self.outputs[key] = {"fingerprint": fingerprint, "stat": stat}
+                self.changed = True
+        self.pending = dict()
+
+    def close(self) -> None:
+        """Record the written output files and write the manifest if it has changed."""
+        self.record_outputs()
+        if not self.changed:
+            return
+
+        # Write to a temporary file first, so that a broken manifest is never left
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=self.manifest_dir, delete=False
+        ) as file:
+            try:
+                json.dump(
+                    {
+                        "manifest_version": MANIFEST_VERSION,
+                        "inputs": self.inputs,
+                        "outputs": self.outputs,
+                    },
+                    file,
+                    ensure_ascii=False,
+                )
+                file.close()
+                os.replace(file.name, self.manifest_file)
+            except BaseException:
+                file.close()
+                os.unlink(file.name)
+                raise
+        self.changed = False
+
+
+def open_build_manifest(
+    app_name: str, settings: Dict[str, Any], cfg: Dict[str, Any]
+) -> BuildManifest:
+    """
+    Open the build manifest of an application in the output directory. Each
+    format has the settings of its own output files added to `settings`.
+    """
+    return BuildManifest(
+        os.path.join(cfg.get("output_path") or "", f".{app_name}.manifest.json"),
+        settings,
+        {
+            format_name: get_output_settings(format_name, cfg)
+            for format_name in match_str_to_formats(cfg["output_format"])
+        },
+    )
+
+
+def get_files_to_build(
+    input_files: List[str], manifest: BuildManifest, cfg: Dict[str, Any]
+) -> List[str]:
+    """
+    Return the input files whose output files are not up to date, or all of
+    them if `force` is set. The output files that are up to date are left in
+    `manifest.up_to_date_outputs`, so that only the others are written again.
+    """
+    log = logging.getLogger(__name__)
+
+    formats = match_str_to_formats(cfg["output_format"])
+    files_to_build = []
+    for input_file in input_files:
+        output_files = {
+            name: get_output_file_name(input_file, format, cfg)
+            for name, format in formats.items()
+        }
+        if manifest.is_up_to_date(input_file, output_files) and not cfg["force"]:
+            log.debug("%s is up to date", input_file)
+        else:
+            files_to_build.append(input_file)
+
+    if cfg["force"]:
+        manifest.up_to_date_outputs.clear()
+
+    if len(files_to_build) < len(input_files):
+        log.info(
+            "Skipping %s files that are up to date",
+            len(input_files) - len(files_to_build),
+        )
+    return files_to_build
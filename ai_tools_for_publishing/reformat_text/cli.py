@@ -2,10 +2,9 @@ import os.path
 import argparse
 import platformdirs
 from ai_tools_for_publishing.cli import set_up_and_run_application, VERBOSITY
-from ai_tools_for_publishing.utils import dict_to_yaml_str
+from ai_tools_for_publishing import utils
 from .default_config import DEFAULT_CONFIG
 from .formats import FORMATS
-from .main import main
 
 # fmt: off
 # -----------------------------------------------------------------------------
@@ -24,12 +23,13 @@ CLI_CONFIG = {
     "log_level": "NONE",
     "log_max_bytes": 1000 * 1024,
     "log_max_files": 10,
+    "document_cache_file": os.path.join(platformdirs.user_cache_dir(PARENT_NAME), "documents.sqlite"),
 }
 APP_CFG = DEFAULT_CONFIG | CLI_CONFIG
-APP_USAGE = f"""
+APP_USAGE = lambda: f"""
 default configuration:
 ---
-{dict_to_yaml_str(APP_CFG)}
+{utils.dict_to_yaml_str(APP_CFG)}
 """
 APP_CLI_ARGUMENTS = (
 (("input_files",              ),{ "nargs": "+",                "metavar": "input.[html|md]",   "help": "HTML or Markdown documents to be processed", }),
@@ -38,9 +38,15 @@ APP_CLI_ARGUMENTS = (
 (("-O",      "--output-path", ),{ "dest": "output_path",       "metavar": "PATH",              "help": "output directory for hyphenated HTML documents", }),
 (("--out",   "--output",      ),{ "dest": "output_path",                                       "help": argparse.SUPPRESS, }),
 (("--output-name",            ),{ "dest": "output_name",       "metavar": "PATTERN",           "help": f"name for output files (Default: \"{DEFAULT_CONFIG['output_name']}\")", }),
-(("--output-format",          ),{ "dest": "output_format",     "metavar": "FORMAT",            "help": f"format for output files ({ ', '.join(list(FORMATS.keys())) }) (Default: html)", }),
+(("--output-format",          ),{ "dest": "output_format",     "metavar": "FORMAT",            "help": f"format for output files, or a comma separated list of them ({ ', '.join(list(FORMATS.keys())) }) (Default: html)", }),
 (("--format", "--fmt"         ),{ "dest": "output_format",                                     "help": argparse.SUPPRESS, }),
+(("--parser",                 ),{ "dest": "parser",            "metavar": "PARSER", "choices": ("auto", "lxml", "html5lib", "html.parser"), "help": "HTML parser (auto, lxml, html5lib, html.parser) (Default: auto = lxml if installed)", }),
+(("-j",      "--jobs",        ),{ "dest": "jobs",              "metavar": "N", "type": int,    "help": "reformat N files in parallel (Default: 1)", }),
+(("--prefetch",               ),{ "dest": "prefetch",          "metavar": "N", "type": int,    "help": f"read up to N files ahead and write in the background, 0 to not (Default: {DEFAULT_CONFIG['prefetch']})", }),
+(("--document-cache",         ),{ "dest": "document_cache",    "action": "store_true",         "help": "keep parsed documents in a cache shared with hyphenate_text", }),
+(("--document-cache-file",    ),{ "dest": "document_cache_file", "metavar": "CACHE.sqlite",    "help": "file of the shared document cache", }),
 (("-o",      "--overwrite",   ),{ "dest": "overwrite",         "action": "store_true",         "help": "overwrite already existing files", }),
+(("--force",                  ),{ "dest": "force",             "action": "store_true",         "help": "rebuild files even if they are up to date", }),
 (("--config",                 ),{ "dest": "config_file",       "metavar": "CONFIG.yaml",       "help": "read configuration from this file (YAML format)", }),
 (("--log-level",              ),{ "dest": "log_level",         "metavar": "LEVEL", "choices": VERBOSITY.keys(), "help": f"set logging level ({ ', '.join(list(VERBOSITY.keys())) }) (Default: {APP_CFG['log_level']})", }),
 (("--loglevel",               ),{ "dest": "log_level",         "choices": VERBOSITY.keys(),    "help": argparse.SUPPRESS, }),
@@ -50,5 +56,10 @@ APP_CLI_ARGUMENTS = (
 
 # -----------------------------------------------------------------------------
 
+def run_main(cfg):
+    # Import the application only after the command line has been parsed
+    from . import main
+    main(cfg)
+
 def cli():
-    set_up_and_run_application(APP_NAME, APP_DESCRIPTION, APP_USAGE, APP_CLI_ARGUMENTS, APP_CFG, main)
+    set_up_and_run_application(APP_NAME, APP_DESCRIPTION, APP_USAGE, APP_CLI_ARGUMENTS, APP_CFG, run_main)
@@ -0,0 +1,221 @@
+import sys
+from typing import Dict, List, Optional, Tuple, Union
+from bs4 import BeautifulSoup, Comment
+from bs4.formatter import Formatter, HTMLFormatter
+
+# The tags that a compact document may have in its body: the ones that the
+# formatters understand and the readers make from Markdown. Documents with
+# other tags are kept as BeautifulSoup objects.
+COMPACT_TAGS = (
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "p",
+    "hr",
+    "br",
+    "em",
+    "i",
+    "strong",
+    "b",
+    "blockquote",
+    "ul",
+    "ol",
+    "li",
+    "a",
+    "code",
+)
+
+# Tags that are written without an end tag when they are empty
+VOID_TAGS = ("hr", "br")
+
+# The name of the root of a fragment, the same as in BeautifulSoup
+ROOT_TAG_NAME = BeautifulSoup.ROOT_TAG_NAME
+
+# Whitespace that BeautifulSoup collapses between tags
+ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+
+
+class CompactElement:
+    """
+    A tag of a compact document. The children are strings and elements, and
+    the attributes are None if there are none. Tag names are interned, so
+    each name is stored only once.
+    """
+
+    __slots__ = ("name", "attrs", "children")
+
+    def __init__(
+        self,
+        name: str,
+        attrs: Optional[Dict[str, Optional[str]]] = None,
+        children: Optional[List[Union[str, "CompactElement"]]] = None,
+    ) -> None:
+        self.name = sys.intern(name)
+        self.attrs = attrs or None
+        self.children = children if children is not None else []
+
+    def __iter__(self):
+        return iter(self.children)
+
+    def __str__(self) -> str:
+        """Return the HTML of the element, like str() of a BeautifulSoup tag."""
+        return decode_element(self, HTMLFormatter.REGISTRY["minimal"])
+
+    def __reduce__(self) -> tuple:
+        # Pickled by the arguments, which is faster and interns the name again
+        return (CompactElement, (self.name, self.attrs, self.children))
+
+
+class CompactComment(str):
+    """A comment in a compact document, which is otherwise a plain string."""
+
+    __slots__ = ()
+
+
+class CompactDocument:
+    """
+    A document that only has the body as a tree, without the per-node
+    overhead of BeautifulSoup. The HTML before and after the body is kept as
+    it is written, and the variables of the document for templating are
+    looked up when it is built. A fragment has no HTML around it, and its
+    body is the root.
+    """
+
+    __slots__ = ("body", "header", "footer", "variables")
+
+    def __init__(
+        self, body: CompactElement, header: str, footer: str, variables: Dict[str, str]
+    ) -> None:
+        self.body = body
+        self.header = header
+        self.footer = footer
+        self.variables = variables
+
+    def __reduce__(self) -> tuple:
+        return (CompactDocument, (self.body, self.header, self.footer, self.variables))
+
+
+# Readers return a compact document if they can, BeautifulSoup if not
+Document = Union[BeautifulSoup, CompactDocument]
+
+
+class CompactDocumentBuilder:
+    """
+    Build a compact fragment with the callbacks that parsers use to build a
+    BeautifulSoup object (hence the names), so that strings and whitespace
+    end up the same in both.
+    """
+
+    def __init__(self) -> None:
+        self.root = CompactElement(ROOT_TAG_NAME)
+        self.stack = [self.root]
+        self.data = []
+
+    def handle_starttag(
+        self,
+        name: str,
+        namespace: Optional[str],
+        nsprefix: Optional[str],
+        attrs: Dict[str, str],
+    ) -> None:
+        self.endData()
+        element = CompactElement(name, attrs)
+        self.stack[-1].children.append(element)
+        self.stack.append(element)
+
+    def handle_endtag(self, name: str, nsprefix: Optional[str] = None) -> None:
+        self.endData()
+        self.stack.pop()
+
+    def handle_data(self, data: str) -> None:
+        self.data.append(data)
+
+    def endData(self, containerClass: Optional[type] = None) -> None:
+        """Add the data so far as a string, or as a comment if asked to."""
+        if not self.data:
+            return
+        data = "".join(self.data)
+        self.data = []
+
+        # Whitespace between tags becomes a single newline or space
+        if not data.strip(ASCII_SPACES):
+            data = "\n" if "\n" in data else " "
+
+        if containerClass is Comment:
+            data = CompactComment(data)
+        self.stack[-1].children.append(data)
+
+    def get_document(self, variables: Dict[str, str]) -> CompactDocument:
+        """Return the document that has been built."""
+        self.endData()
+        return CompactDocument(self.root, "", "", variables)
+
+
+def decode_element(element: CompactElement, formatter: Formatter) -> str:
+    """
+    Return the HTML of an element, written the same way as BeautifulSoup
+    writes a tag with the formatter. The root of a fragment is not written,
+    only its children.
+    """
+    pieces = []
+    stack = [(iter((element,)), "")]
+    while stack:
+        children, end = stack[-1]
+        child = next(children, None)
+
+        if child is None:
+            stack.pop()
+            pieces.append(end)
+        elif isinstance(child, CompactComment):
+            pieces.append("<!--" + child + "-->")
+        elif isinstance(child, str):
+            pieces.append(formatter.substitute(child))
+        elif child.name == ROOT_TAG_NAME:
+            stack.append((iter(child.children), ""))
+        else:
+            attributes = [
+                (
+                    key
+                    if value is None
+                    else key
+                    + "="
+                    + formatter.quoted_attribute_value(formatter.attribute_value(value))
+                )
+                for key, value in formatter.attributes(child)
+            ]
+            start = "<" + " ".join([child.name] + attributes)
+            if not child.children and child.name in VOID_TAGS:
+                pieces.append(start + (formatter.void_element_close_prefix or "") + ">")
+            else:
+                pieces.append(start + ">")
+                stack.append((iter(child.children), "</" + child.name + ">"))
+
+    return "".join(pieces)
+
+
+def find_strings(
+    element: CompactElement,
+) -> List[Tuple[List[Union[str, CompactElement]], int]]:
+    """
+    Return the places of the strings (and comments) under an element in
+    document order, like find_all(string=True) does in BeautifulSoup. Each
+    place is a list of children and the index of the string in it, so the
+    strings can be replaced.
+    """
+    places = []
+    stack = [(element.children, 0)]
+    while stack:
+        children, index = stack.pop()
+        while index < len(children):
+            child = children[index]
+            index += 1
+            if isinstance(child, str):
+                places.append((children, index - 1))
+            else:
+                stack.append((children, index))
+                stack.append((child.children, 0))
+                break
+    return places
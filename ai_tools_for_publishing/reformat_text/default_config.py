@@ -1,8 +1,14 @@
 DEFAULT_CONFIG = {
     "dry_run": False,
     "overwrite": False,
+    "force": False,
+    "jobs": 1,
+    "prefetch": 2,
     "output_name": "{name}{ext}",
     "output_format": "markdown",
+    "parser": "auto",
+    "document_cache": False,
+    "document_cache_max_bytes": 1024 * 1024 * 1024,
     # -----------------------------------------------------------------------------
     "xhtml_template": """<?xml version="1.0" encoding="UTF-8" ?>
 <html xmlns="http://www.w3.org/1999/xhtml" xml:lang="{language}">
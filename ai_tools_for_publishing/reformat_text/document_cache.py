@@ -0,0 +1,172 @@
+import os.path
+import time
+import pickle
+import pathlib
+import sqlite3
+import hashlib
+import logging
+from typing import Any, Dict, Optional
+from ai_tools_for_publishing.utils import get_package_version, get_tool_version
+from .compact_document import CompactDocument
+
+# Bump this when the pickled documents change in a way the versions do not show
+DOCUMENT_CACHE_VERSION = 2
+
+# Libraries whose versions may change the parsed documents
+PARSER_PACKAGES = {
+    "lxml": "lxml",
+    "html5lib": "html5lib",
+    "html.parser": None,
+}
+
+
+def get_document_cache_settings(parser: str) -> str:
+    """Return a string identifying the parser and the versions that affect parsing."""
+    settings = (
+        f"cache={DOCUMENT_CACHE_VERSION}"
+        f"; tools={get_tool_version()}"
+        f"; beautifulsoup4={get_package_version('beautifulsoup4')}"
+        f"; markdown-it-py={get_package_version('markdown-it-py')}"
+        f"; parser={parser}"
+    )
+    if PARSER_PACKAGES.get(parser):
+        settings += f" {get_package_version(PARSER_PACKAGES[parser])}"
+    return settings
+
+
+class DocumentCache:
+    """
+    Persistent cache of parsed documents, shared by the tools.
+
+    Compact documents are pickled to an SQLite database and keyed by a hash
+    of the input file and the parser and versions that were used, so a file
+    is parsed only once until it (or any of them) changes. When the cache
+    grows beyond `max_bytes`, the least recently used documents are evicted.
+    Documents that are kept as BeautifulSoup objects are not cached.
+
+    Each document is written when it is added, so several processes can use
+    the same cache at the same time.
+    """
+
+    def __init__(self, cache_file: str, max_bytes: int) -> None:
+        log = logging.getLogger(__name__)
+
+        # Try to create the cache dir
+        cache_dir, _ = os.path.split(cache_file)
+        if cache_dir:
+            pathlib.Path(cache_dir).mkdir(parents=True, exist_ok=True)
+
+        log.info("Opening document cache %s...", cache_file)
+        # The reader thread of a pipeline may use the cache instead of the
+        # thread that opened it, but only one thread at a time
+        self.connection = sqlite3.connect(
+            cache_file, timeout=60, check_same_thread=False
+        )
+        self.connection.execute(
+            """CREATE TABLE IF NOT EXISTS documents (
+                key TEXT NOT NULL PRIMARY KEY,
+                document BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )"""
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS last_used_index ON documents (last_used)"
+        )
+        self.cache_file = cache_file
+        self.max_bytes = max_bytes
+        self.settings: Dict[str, str] = dict()  # Settings of each parser
+
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self) -> "DocumentCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def get_key(self, input_file: str, parser: str) -> str:
+        """Return the key of an input file parsed with a parser."""
+        if parser not in self.settings:
+            self.settings[parser] = get_document_cache_settings(parser)
+
+        # The same bytes read as Markdown and as HTML are different documents
+        _, file_extension = os.path.splitext(input_file)
+        reader = "markdown" if file_extension[1:2].lower() == "m" else "html"
+
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{self.settings[parser]}; reader={reader}\n".encode("utf-8"))
+        with open(input_file, "rb") as file:
+            while chunk := file.read(1024 * 1024):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[CompactDocument]:
+        """Return the cached document of a key, or None if not found."""
+        log = logging.getLogger(__name__)
+
+        row = self.connection.execute(
+            "SELECT document FROM documents WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        try:
+            document = pickle.loads(row[0])
+        except Exception as error:
+            log.warning(
+                "Ignoring a broken cached document",
+                extra={"file": self.cache_file, "error": str(error)},
+            )
+            with self.connection:
+                self.connection.execute("DELETE FROM documents WHERE key = ?", (key,))
+            self.misses += 1
+            return None
+
+        with self.connection:
+            self.connection.execute(
+                "UPDATE documents SET last_used = ? WHERE key = ?", (time.time(), key)
+            )
+        self.hits += 1
+        return document
+
+    def set(self, key: str, document: CompactDocument) -> None:
+        """Add a document to the cache and evict the least recently used ones."""
+        blob = pickle.dumps(document, protocol=pickle.HIGHEST_PROTOCOL)
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?)",
+                (key, blob, len(blob), time.time()),
+            )
+            self.connection.execute(
+                """DELETE FROM documents WHERE key IN (
+                    SELECT key FROM (
+                        SELECT key, SUM(size) OVER (ORDER BY last_used DESC) AS total
+                        FROM documents
+                    ) WHERE total > ?
+                )""",
+                (self.max_bytes,),
+            )
+
+    def close(self) -> None:
+        """Log the statistics and close the database."""
+        log = logging.getLogger(__name__)
+        log.info(
+            "Document cache statistics",
+            extra={
+                "file": self.cache_file,
+                "hits": self.hits,
+                "misses": self.misses,
+            },
+        )
+        self.connection.close()
+
+
+def open_document_cache(cfg: Dict[str, Any]) -> Optional[DocumentCache]:
+    """Open the cache of parsed documents, if asked to."""
+    if not cfg["document_cache"] or cfg["dry_run"]:
+        return None
+
+    return DocumentCache(cfg["document_cache_file"], cfg["document_cache_max_bytes"])
@@ -1,13 +1,19 @@
 import logging
-from bs4 import BeautifulSoup, Tag
+from typing import Union
+from bs4 import Tag
+from .compact_document import CompactDocument, Document, CompactElement
 
 
-def get_body_from_soup(soup: BeautifulSoup) -> Tag:
+def get_body_from_soup(soup: Document) -> Union[Tag, CompactElement]:
     """
     Return the <body> tag from a BeautifulSoup object,
     or the entire soup if no <body> tag is found.
+    The body of a compact document is an element.
     """
     log = logging.getLogger(__name__)
+    if isinstance(soup, CompactDocument):
+        return soup.body
+
     body = soup.find("body")
     if not body:
         log.info("<body> not found, using soup")
@@ -1,44 +1,75 @@
-from typing import Any, Dict
-from .soup_to_html import soup_to_html
-from .soup_to_xhtml import soup_to_xhtml
-from .soup_to_markdown import soup_to_markdown, each_sentence_on_new_line
-from .soup_to_simplified_html import soup_to_simplified_html
+import importlib
+from typing import Any, Callable, Dict
+
+
+def lazy_formatter(module_name: str, function_name: str) -> Callable:
+    """Return a formatter that imports its module only when it is first called."""
+
+    def formatter(*args):
+        module = importlib.import_module(module_name, __package__)
+        return getattr(module, function_name)(*args)
+
+    return formatter
 
 
 FORMATS = {
     "html": {
         "description": "Parsed HTML file",
         "extension": "_parsed.html",
-        "formatter": soup_to_html,
+        "formatter": lazy_formatter(".soup_to_html", "soup_to_html"),
     },
     "simplified_html": {
         "description": "Simplified HTML file",
         "extension": "_simplified.html",
-        "formatter": soup_to_simplified_html,
+        "formatter": lazy_formatter(
+            ".soup_to_simplified_html", "soup_to_simplified_html"
+        ),
+        # Writes straight to a file instead of returning a string
+        "writer": lazy_formatter(".soup_to_simplified_html", "write_simplified_html"),
+        "template": "simplified_html_template",
     },
     "xhtml": {
         "description": "XHTML file suitable for EPUB",
         "extension": "_reformatted.xhtml",
-        "formatter": soup_to_xhtml,
+        "formatter": lazy_formatter(".soup_to_xhtml", "soup_to_xhtml"),
+        "template": "xhtml_template",
     },
     "md": {
         "description": "Simplified Markdown file",
         "extension": "_reformatted.md",
-        "formatter": soup_to_markdown,
+        "formatter": lazy_formatter(".soup_to_markdown", "soup_to_markdown"),
     },
     "paragraph_md": {
         "description": "Paragraph separated Markdown file",
         "extension": ".md",
-        "formatter": lambda soup, templating_variables, cfg: each_sentence_on_new_line(
-            soup_to_markdown(soup, templating_variables, cfg)
-        ),
+        "formatter": lazy_formatter(".soup_to_markdown", "soup_to_paragraph_markdown"),
+        # Made from the output of another format when writing several formats
+        "based_on": "md",
+        "converter": lazy_formatter(".soup_to_markdown", "each_sentence_on_new_line"),
     },
 }
 
 
-def match_str_to_format(partial_format_str: str) -> Dict[str, Any]:
-    """Find the format that matches the partial format name."""
+def match_str_to_format_name(partial_format_str: str) -> str:
+    """Find the name of the format that matches the partial format name."""
     for key in FORMATS.keys():
         if key.startswith(partial_format_str[0].lower()):
-            return FORMATS[key]
+            return key
     raise ValueError(f"Unknown format: {partial_format_str}")
+
+
+def match_str_to_format(partial_format_str: str) -> Dict[str, Any]:
+    """Find the format that matches the partial format name."""
+    return FORMATS[match_str_to_format_name(partial_format_str)]
+
+
+def match_str_to_formats(partial_format_strs: str) -> Dict[str, Dict[str, Any]]:
+    """Find the formats that match a comma separated list of partial format names."""
+    names = [
+        match_str_to_format_name(partial_format_str.strip())
+        for partial_format_str in partial_format_strs.split(",")
+        if partial_format_str.strip()
+    ]
+    if not names:
+        raise ValueError(f"Unknown format: {partial_format_strs}")
+    return {name: FORMATS[name] for name in names}
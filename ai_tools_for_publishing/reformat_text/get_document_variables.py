@@ -0,0 +1,36 @@
+from typing import Dict
+from .compact_document import CompactDocument, Document
+
+# The variables of a fragment, which has no <html>, <title> or <meta> tags
+DEFAULT_DOCUMENT_VARIABLES = {
+    "language": "en",
+    "title": "",
+    "author": "",
+    "copyright": "",
+}
+
+
+def get_document_variables(soup: Document) -> Dict[str, str]:
+    """Return the language, title, author and copyright of a document for templating."""
+
+    # Compact documents have them looked up already
+    if isinstance(soup, CompactDocument):
+        return soup.variables
+
+    html_tag = soup.find("html")
+    body_tag = soup.find("body")
+    title_tag = soup.find("title")
+    author_tag = soup.find("meta", attrs={"name": "author"})
+    copyright_tag = soup.find("meta", attrs={"name": "copyright"})
+
+    language = (
+        html_tag.get("lang") if html_tag else body_tag.get("lang") if body_tag else "en"
+    )
+    language = language.strip().lower()
+
+    return {
+        "language": language,
+        "title": title_tag.get_text().strip() if title_tag else "",
+        "author": author_tag.get("content", "").strip() if author_tag else "",
+        "copyright": copyright_tag.get("content").strip() if copyright_tag else "",
+    }
@@ -1,10 +1,21 @@
 import os.path
-from typing import Any, Dict
+import time
+from typing import Any, Dict, List, Optional
 import logging
 from bs4 import BeautifulSoup
-from .read_file_to_soup import read_file_to_soup
+from ai_tools_for_publishing.cli import map_in_processes, map_in_pipeline
+from .read_document import read_file_to_document, get_parser
 from .read_html_file import read_html_file
-from .write_soup_to_file import write_soup_to_file
+from .build_manifest import open_build_manifest, get_files_to_build
+from .document_cache import DocumentCache, open_document_cache
+from .write_document import (
+    write_soup_to_file,
+    get_shared_templating_variables,
+    set_shared_templating_variables,
+)
+
+# The configuration of a worker process
+worker_cfg: Dict[str, Any] = None
 
 
 def main(cfg: Dict[str, Any]) -> None:
@@ -21,25 +32,156 @@ def main(cfg: Dict[str, Any]) -> None:
             raise FileNotFoundError(f"'{output_path}' is not a directory")
         log.info("Writing to directory %s...", output_path)
 
-    # The main loop
-    for input_file in input_files:
+    start = time.perf_counter()
 
-        # Read the file into a BeautifulSoup object
-        try:
-            soup = read_file_to_soup(input_file)
-        except Exception as error:
+    # Skip the files and the formats whose outputs are up to date
+    manifest = open_build_manifest("reformat_text", get_build_settings(cfg), cfg)
+    input_files = get_files_to_build(input_files, manifest, cfg)
+    cfg = cfg | {"up_to_date_outputs": manifest.up_to_date_outputs}
+
+    # Reformat the files one by one, reading the next ones ahead and writing
+    # in the background...
+    document_cache = None
+    if cfg["jobs"] <= 1:
+        document_cache = open_document_cache(cfg)
+        results = map_in_pipeline(
+            lambda input_file: read_file_to_reformat(input_file, cfg, document_cache),
+            lambda input_file, result: result,
+            lambda input_file, result: write_reformatted_file(result, cfg),
+            input_files,
+            cfg["prefetch"],
+        )
+
+    # ...or in parallel, with the same date and time for templating in every worker
+    else:
+        log.info("Reformatting with %s parallel jobs...", cfg["jobs"])
+        results = map_in_processes(
+            reformat_file_in_worker,
+            input_files,
+            cfg["jobs"],
+            initializer=set_up_worker,
+            initargs=(cfg, get_shared_templating_variables(cfg)),
+        )
+
+    # The results come in the order of the input files
+    timings = []
+    for result in results:
+        if result["error"]:
             log.error(
-                "Error while reading file",
-                extra={"file": input_file, "error": str(error)},
+                result["error"],
+                extra={"file": result["file"], "error": result["details"]},
             )
-            continue
+        timings.append(result)
+
+    if document_cache:
+        document_cache.close()
+
+    # Record the files that were written for the next run
+    if not cfg["dry_run"]:
+        manifest.close()
+
+    log.info(
+        "Reformatted %s files in %.2f s:\n%s",
+        len(timings),
+        time.perf_counter() - start,
+        format_timings(timings),
+    )
+
+
+def get_build_settings(cfg: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Return the settings that affect the output files, for the build manifest:
+    the parser that is actually used. The manifest adds the settings of each
+    format, such as the template.
+    """
+    return {"parser": get_parser(cfg["parser"])}
+
+
+def reformat_file(
+    input_file: str,
+    cfg: Dict[str, Any],
+    document_cache: Optional[DocumentCache] = None,
+) -> Dict[str, Any]:
+    """
+    Read a file (or load it from the document cache) and write it in the
+    configured formats. Return the file, how long it took and the error, if
+    there was one.
+    """
+    return write_reformatted_file(
+        read_file_to_reformat(input_file, cfg, document_cache), cfg
+    )
+
 
-        # Write the soup to a file
+def read_file_to_reformat(
+    input_file: str,
+    cfg: Dict[str, Any],
+    document_cache: Optional[DocumentCache] = None,
+) -> Dict[str, Any]:
+    """
+    Read a file into a compact document, or a BeautifulSoup object. Return
+    the file, the document, how long it took and the error, if there was one.
+    """
+    start = time.perf_counter()
+    result = {"file": input_file, "document": None, "error": None, "details": None}
+
+    try:
+        result["document"] = read_file_to_document(
+            input_file, cfg["parser"], document_cache
+        )
+    except Exception as error:
+        result |= {"error": "Error while reading file", "details": str(error)}
+
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def write_reformatted_file(
+    result: Dict[str, Any], cfg: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Write a document that has been read in the configured formats. Return
+    the result of reading without the document, with the time taken and the
+    error of writing added.
+    """
+    start = time.perf_counter()
+    soup = result.pop("document")
+
+    if not result["error"]:
         try:
-            write_soup_to_file(input_file, soup, cfg)
+            write_soup_to_file(result["file"], soup, cfg)
         except Exception as error:
-            log.error(
-                "Error while writing HTML file",
-                extra={"file": input_file, "error": str(error)},
-            )
-            continue
+            result |= {"error": "Error while writing HTML file", "details": str(error)}
+
+    result["seconds"] += time.perf_counter() - start
+    return result
+
+
+def format_timings(timings: List[Dict[str, Any]]) -> str:
+    """Return a table of the time taken by each file."""
+    width = max((len(timing["file"]) for timing in timings), default=4)
+    lines = [f"{'file':<{width}} {'seconds':>8}  result"]
+    for timing in timings:
+        lines.append(
+            f"{timing['file']:<{width}} {timing['seconds']:>8.2f}  "
+            + ("error" if timing["error"] else "ok")
+        )
+    return "\n".join(lines)
+
+
+def set_up_worker(
+    cfg: Dict[str, Any], shared_templating_variables: Dict[str, str]
+) -> None:
+    """Store the shared state of a worker process."""
+    global worker_cfg
+    worker_cfg = cfg
+    set_shared_templating_variables(shared_templating_variables)
+
+
+def reformat_file_in_worker(input_file: str) -> Dict[str, Any]:
+    """Reformat a single document in a worker process."""
+    document_cache = open_document_cache(worker_cfg)
+    try:
+        return reformat_file(input_file, worker_cfg, document_cache)
+    finally:
+        if document_cache:
+            document_cache.close()
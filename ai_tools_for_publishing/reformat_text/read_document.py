@@ -0,0 +1,133 @@
+import re
+import os.path
+import logging
+import importlib.util
+from typing import Optional
+from bs4 import BeautifulSoup, Tag
+from .read_html_file import read_html_file
+from .read_markdown_file import (
+    read_markdown_tokens,
+    render_markdown_tokens,
+    markdown_tokens_to_soup,
+    markdown_tokens_to_document,
+)
+from .compact_document import Document
+from .document_cache import DocumentCache
+from .soup_to_compact_document import soup_to_compact_document
+
+
+# Tags that lxml and html5lib add around a fragment of HTML
+DOCUMENT_TAGS = ("html", "head", "body")
+DOCUMENT_TAG_RE = re.compile(r"<(?:html|head|body)[\s>]", re.IGNORECASE)
+
+
+class UnsupportedFileExtension(Exception):
+    def __init__(self, *args):
+        super().__init__("Unsupported file extension", *args)
+
+
+def get_parser(parser: str = "auto") -> str:
+    """
+    Return the BeautifulSoup tree builder to use. "auto" means lxml
+    if it is installed, or the (slower) built-in html.parser if not.
+
+    All parsers give the same content for well-formed documents, but lxml and
+    html5lib may move or drop whitespace between <html>, <head> and <body>.
+    Broken markup, such as unclosed or misnested tags, is repaired differently
+    by each one: lxml and html5lib follow the browsers more closely.
+    """
+    if parser == "auto":
+        return "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+    return parser
+
+
+def read_file_to_soup(input_file: str, parser: str = "auto") -> BeautifulSoup:
+
+    log = logging.getLogger(__name__)
+
+    # Extract file extension from input_file
+    _, file_extension = os.path.splitext(input_file)
+
+    # Determine the file type based on the first letter of the file extension
+    parser = get_parser(parser)
+    match file_extension[1].lower() if file_extension else "":
+        case "x" | "h":
+            html = read_html_file(input_file)
+        case "m":
+            # Build the soup straight from the Markdown if it is simple enough
+            tokens = read_markdown_tokens(input_file)
+            soup = markdown_tokens_to_soup(tokens, parser)
+            if soup is not None:
+                log.info("Built beautiful soup from Markdown with %s", parser)
+                return soup
+            html = render_markdown_tokens(tokens)
+        case _:
+            raise UnsupportedFileExtension(file_extension)
+
+    return parse_html_to_soup(html, parser)
+
+
+def parse_html_to_soup(html: str, parser: str) -> BeautifulSoup:
+    """Parse HTML to a BeautifulSoup object, keeping fragments as fragments."""
+
+    log = logging.getLogger(__name__)
+
+    # Try to parse to soup
+    log.info("Parsing to beautiful soup with %s", parser)
+    soup = BeautifulSoup(html, parser)
+
+    # Fragments, such as rendered Markdown, are kept as fragments like
+    # html.parser does, instead of wrapping them in a document
+    if parser != "html.parser" and not DOCUMENT_TAG_RE.search(html):
+        for name in DOCUMENT_TAGS:
+            tag = soup.find(name)
+            if tag:
+                tag.unwrap()
+
+    return soup
+
+
+def read_file_to_document(
+    input_file: str, parser: str = "auto", cache: Optional[DocumentCache] = None
+) -> Document:
+    """
+    Read a file to a compact document, or to a BeautifulSoup object if it has
+    markup that compact documents do not support. Markdown is built straight
+    into a compact document, HTML is parsed to soup and converted.
+
+    If a document cache is given, compact documents are loaded from it
+    instead of parsing the file again, and added to it when they are parsed.
+    """
+
+    log = logging.getLogger(__name__)
+
+    parser = get_parser(parser)
+    if cache:
+        key = cache.get_key(input_file, parser)
+        document = cache.get(key)
+        if document is not None:
+            log.info("Loaded %s from the document cache", input_file)
+            return document
+
+    _, file_extension = os.path.splitext(input_file)
+    document = None
+    if file_extension[1:2].lower() == "m":
+        tokens = read_markdown_tokens(input_file)
+        document = markdown_tokens_to_document(tokens)
+        if document is not None:
+            log.info("Built compact document from Markdown")
+        else:
+            soup = parse_html_to_soup(render_markdown_tokens(tokens), parser)
+    else:
+        soup = read_file_to_soup(input_file, parser)
+
+    if document is None:
+        document = soup_to_compact_document(soup)
+        if document is None:
+            log.info("Keeping beautiful soup for markup that is not supported")
+            return soup
+        log.info("Converted beautiful soup to compact document")
+
+    if cache:
+        cache.set(key, document)
+    return document
@@ -1,57 +1,80 @@
+import re
+import mmap
+import codecs
 import logging
+from typing import Optional
+
+# How much of the beginning of a file is searched for an encoding declaration
+SNIFF_SIZE = 4096
+
+# Byte order marks, longest first because the UTF-32 LE mark begins like UTF-16 LE
+BYTE_ORDER_MARKS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+# <?xml version="1.0" encoding="..." ?> at the very beginning
+XML_DECLARATION_RE = re.compile(
+    rb"""\A\s*<\?xml[^>]*?\sencoding\s*=\s*["']?\s*([\w.:-]+)""", re.IGNORECASE
+)
+
+# <meta charset="..."> or <meta http-equiv="Content-Type" content="...; charset=...">
+META_CHARSET_RE = re.compile(
+    rb"""<meta\s[^>]*?charset\s*=\s*["']?\s*([\w.:-]+)""", re.IGNORECASE
+)
+
+
+def guess_encoding(binary: bytes) -> Optional[str]:
+    """
+    Seek an encoding from the beginning of an HTML or XML file and return it,
+    or None if not found. The byte order mark comes first, then the XML
+    declaration and then <meta charset>, like in web browsers.
+    """
+    for byte_order_mark, encoding in BYTE_ORDER_MARKS:
+        if binary.startswith(byte_order_mark):
+            return encoding
+
+    for regex in (XML_DECLARATION_RE, META_CHARSET_RE):
+        match = regex.search(binary)
+        if not match:
+            continue
+        encoding = match.group(1).decode("ascii").lower()
+
+        # Skip declarations of encodings that Python does not know
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            continue
+        return encoding
+
+    return None
 
 
 def read_html_file(input_file: str) -> str:
-    """Read HTML file and try to guess encoding."""
+    """
+    Read HTML file and try to guess encoding. Only the beginning of the file
+    is searched for the encoding, UTF-8 is used if none is found.
+    """
 
     log = logging.getLogger(__name__)
 
-    # Gobble up the whole file in binary format
+    # Map the file to memory, so that it is copied only when it is decoded
     log.info("Reading HTML file %s...", input_file)
     with open(input_file, "rb") as file:
-        binary = file.read()
-
-    # Seek possible encoding definition
-    prefixes = (
-        b"charset=",
-        b"Charset=",
-        b"encoding=",
-        b"Encoding=",
-    )
-    start = -1
-    for item in prefixes:
-        start = binary.find(item)
-        if start != -1:
-            start += len(item)
-            break
-
-    # If none is found, return "utf-8"
-    if start == -1:
-        return "utf-8"
-
-    # Skip an optional quotation mark
-    if binary[start] == ord(b'"') or binary[start] == ord(b"'"):
-        start += 1
-
-    # Try to find where the encoding ends
-    postfixes = (
-        b"'",
-        b'"',
-        b" ",
-        b"\t",
-        b"?",
-        b"/",
-        b">",
-    )
-    end = start + 40  # No encoding name should be longer than 40 chars...
-    for item in postfixes:
-        possible_end = binary.find(item, start, end)
-        if possible_end == -1:
-            continue
-        if possible_end < end:
-            end = possible_end
+        try:
+            binary = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            return ""
+
+    with binary:
+        encoding = guess_encoding(binary[:SNIFF_SIZE])
+        if not encoding:
+            encoding = "utf-8"
+            log.debug("No encoding found in %s, using UTF-8", input_file)
 
-    # Good luck...
-    encoding = binary[start:end].decode("ascii").strip().lower()
-    log.debug("Guessed encoding for %s", input_file, extra={"encoding": encoding})
-    return binary.decode(encoding)
+        log.debug("Guessed encoding for %s", input_file, extra={"encoding": encoding})
+        return str(binary, encoding)
@@ -1,6 +1,40 @@
 import logging
+from typing import List, Optional, Union
+from bs4 import BeautifulSoup, Comment
 from markdown_it import MarkdownIt
+from markdown_it.token import Token
 from markdown_it.rules_block.state_block import StateBlock
+from .compact_document import CompactDocument, CompactDocumentBuilder
+from .get_document_variables import DEFAULT_DOCUMENT_VARIABLES
+
+# The Markdown parser of this process, with the beat plugin
+markdown_parser: MarkdownIt = None
+
+# Tokens that are built straight into a tree, all others are rendered to HTML
+# and parsed
+MARKDOWN_BLOCK_TAGS = (
+    "paragraph_open",
+    "paragraph_close",
+    "heading_open",
+    "heading_close",
+    "blockquote_open",
+    "blockquote_close",
+    "bullet_list_open",
+    "bullet_list_close",
+    "ordered_list_open",
+    "ordered_list_close",
+    "list_item_open",
+    "list_item_close",
+    "hr",
+)
+MARKDOWN_INLINE_TAGS = (
+    "em_open",
+    "em_close",
+    "strong_open",
+    "strong_close",
+    "link_open",
+    "link_close",
+)
 
 
 def custom_plugin(md: MarkdownIt) -> bool:
@@ -46,8 +80,18 @@ def custom_plugin(md: MarkdownIt) -> bool:
     md.block.ruler.before("hr", "beat", beat)
 
 
-def read_markdown_file(input_file: str) -> str:
-    """Read Markdown file."""
+def get_markdown_parser() -> MarkdownIt:
+    """Return the Markdown parser of this process, creating it if necessary."""
+    global markdown_parser
+    if not markdown_parser:
+        markdown_parser = MarkdownIt(
+            "commonmark", {"xhtmlOut": False, "typographer": False}
+        ).use(custom_plugin)
+    return markdown_parser
+
+
+def read_markdown_tokens(input_file: str) -> List[Token]:
+    """Read Markdown file and return its markdown-it tokens."""
 
     log = logging.getLogger(__name__)
 
@@ -56,8 +100,112 @@ def read_markdown_file(input_file: str) -> str:
     with open(input_file) as file:
         raw = file.read()
 
+    return get_markdown_parser().parse(raw)
+
+
+def render_markdown_tokens(tokens: List[Token]) -> str:
+    """Return a HTML representation of markdown-it tokens."""
+    md = get_markdown_parser()
+    return md.renderer.render(tokens, md.options, dict())
+
+
+def read_markdown_file(input_file: str) -> str:
+    """Read Markdown file."""
+
     # Return a HTML representation of it
-    md = MarkdownIt("commonmark", {"xhtmlOut": False, "typographer": False}).use(
-        custom_plugin
-    )
-    return md.render(raw)
+    return render_markdown_tokens(read_markdown_tokens(input_file))
+
+
+def build_from_markdown_tokens(
+    tokens: List[Token], target: Union[BeautifulSoup, CompactDocumentBuilder]
+) -> bool:
+    """
+    Build a tree straight from markdown-it tokens, without rendering them to
+    HTML and parsing it again. The tokens are fed to the target like a parser
+    would feed the rendered HTML, including the newlines between blocks, so
+    the tree is the same. Return False if there are tokens that are not
+    supported, such as raw HTML, images and code.
+    """
+    md = get_markdown_parser()
+
+    def start_or_end_tag(token: Token) -> None:
+        if token.nesting != -1:
+            attrs = {name: str(value) for name, value in token.attrs.items()}
+            target.handle_starttag(token.tag, None, None, attrs)
+        if token.nesting != 1:
+            target.handle_endtag(token.tag)
+
+    for index, token in enumerate(tokens):
+
+        # Text and inline tags
+        if token.type == "inline":
+            for child in token.children or ():
+                # Empty strings would become spaces
+                if child.type == "text":
+                    if child.content:
+                        target.handle_data(child.content)
+                elif child.type == "softbreak":
+                    target.handle_data("\n")
+                elif child.type == "hardbreak":
+                    target.handle_starttag("br", None, None, dict())
+                    target.handle_endtag("br")
+                    target.handle_data("\n")
+                elif child.type == "code_inline":
+                    target.handle_starttag("code", None, None, dict())
+                    if child.content:
+                        target.handle_data(child.content)
+                    target.handle_endtag("code")
+                elif child.type in MARKDOWN_INLINE_TAGS:
+                    start_or_end_tag(child)
+                else:
+                    return False
+
+        # Block tags and beats, with the newlines that the renderer would add
+        elif token.type in MARKDOWN_BLOCK_TAGS or token.type == "comment":
+            html = md.renderer.renderToken(tokens, index, md.options, dict())
+            if not html:
+                continue
+            if html.startswith("\n"):
+                target.handle_data("\n")
+            if token.type == "comment":
+                target.endData()
+                target.handle_data(token.tag[len("!--") : -len("--")])
+                target.endData(Comment)
+            else:
+                start_or_end_tag(token)
+            if html.endswith("\n"):
+                target.handle_data("\n")
+
+        else:
+            return False
+
+    target.endData()
+    return True
+
+
+def markdown_tokens_to_soup(
+    tokens: List[Token], parser: str
+) -> Optional[BeautifulSoup]:
+    """
+    Build a BeautifulSoup object straight from markdown-it tokens. Return None
+    if there are tokens that are not supported.
+    """
+
+    # Start from an empty fragment, even if the parser would make a document
+    soup = BeautifulSoup("", parser)
+    soup.reset()
+
+    if not build_from_markdown_tokens(tokens, soup):
+        return None
+    return soup
+
+
+def markdown_tokens_to_document(tokens: List[Token]) -> Optional[CompactDocument]:
+    """
+    Build a compact document straight from markdown-it tokens. Return None if
+    there are tokens that are not supported.
+    """
+    builder = CompactDocumentBuilder()
+    if not build_from_markdown_tokens(tokens, builder):
+        return None
+    return builder.get_document(dict(DEFAULT_DOCUMENT_VARIABLES))
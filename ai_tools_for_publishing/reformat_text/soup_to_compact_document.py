@@ -0,0 +1,82 @@
+from typing import Dict, Optional
+from bs4 import BeautifulSoup, Tag, NavigableString, Comment
+from .compact_document import (
+    COMPACT_TAGS,
+    CompactComment,
+    CompactDocument,
+    CompactElement,
+)
+from .get_document_variables import get_document_variables
+from .find_body import get_body_from_soup
+from .soup_to_html import HTML5_FORMATTER
+
+# Marks the place of the body in the HTML around it
+BODY_MARK = "\0body\0"
+
+
+def get_compact_attrs(tag: Tag) -> Dict[str, Optional[str]]:
+    """Return the attributes of a tag with multi-valued ones joined, as they are written."""
+    return {
+        str(key): " ".join(value) if isinstance(value, list) else value
+        for key, value in tag.attrs.items()
+    }
+
+
+def tag_to_element(tag: Tag) -> Optional[CompactElement]:
+    """
+    Return a compact element with the same content as a tag, or None if there
+    are tags or strings that compact documents do not support.
+    """
+    element = CompactElement(tag.name, get_compact_attrs(tag))
+    stack = [(iter(tag), element.children)]
+    while stack:
+        nodes, children = stack[-1]
+        node = next(nodes, None)
+
+        if node is None:
+            stack.pop()
+        elif type(node) is NavigableString:
+            children.append(str(node))
+        elif type(node) is Comment:
+            children.append(CompactComment(node))
+        elif type(node) is Tag and node.name in COMPACT_TAGS and not node.prefix:
+            child = CompactElement(node.name, get_compact_attrs(node))
+            children.append(child)
+            stack.append((iter(node), child.children))
+        else:
+            return None
+
+    return element
+
+
+def soup_to_compact_document(soup: BeautifulSoup) -> Optional[CompactDocument]:
+    """
+    Return a compact document with the same content as a BeautifulSoup object,
+    or None if its body has markup that compact documents do not support.
+    The soup is not changed.
+    """
+    # Documents whose variables cannot be looked up are kept as they are,
+    # so that the error is reported when they are written
+    try:
+        variables = get_document_variables(soup)
+    except AttributeError:
+        return None
+
+    body = get_body_from_soup(soup)
+    element = tag_to_element(body)
+    if element is None:
+        return None
+
+    # Write the HTML around the body with a mark in place of it
+    header, footer = "", ""
+    if body is not soup:
+        mark = NavigableString(BODY_MARK)
+        body.replace_with(mark)
+        try:
+            header, _, footer = soup.decode(formatter=HTML5_FORMATTER).partition(
+                BODY_MARK
+            )
+        finally:
+            mark.replace_with(body)
+
+    return CompactDocument(element, header, footer, variables)
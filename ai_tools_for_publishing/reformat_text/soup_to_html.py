@@ -1,15 +1,20 @@
 from typing import Dict, Any
-from bs4 import BeautifulSoup
 from bs4.formatter import Formatter, EntitySubstitution
+from .compact_document import CompactDocument, Document, decode_element
+
+HTML5_FORMATTER = Formatter(
+    entity_substitution=EntitySubstitution.substitute_xml,
+    void_element_close_prefix=None,
+)
 
 
 def soup_to_html(
-    soup: BeautifulSoup, templating_variables: Dict[str, str], cfg: Dict[str, Any]
+    soup: Document, templating_variables: Dict[str, str], cfg: Dict[str, Any]
 ) -> str:
-    """Convert a BeautifulSoup object to an HTML string."""
+    """Convert a document to an HTML string."""
+
+    # The HTML around the body of a compact document is already written
+    if isinstance(soup, CompactDocument):
+        return soup.header + decode_element(soup.body, HTML5_FORMATTER) + soup.footer
 
-    html5_formatter = Formatter(
-        entity_substitution=EntitySubstitution.substitute_xml,
-        void_element_close_prefix=None,
-    )
-    return soup.decode(formatter=html5_formatter)
+    return soup.decode(formatter=HTML5_FORMATTER)
@@ -1,37 +1,71 @@
 import re
 import textwrap
-from typing import Any, Dict
-from bs4 import BeautifulSoup, Tag, NavigableString
+from typing import Any, Dict, List, Union
+from bs4 import Tag
 from ai_tools_for_publishing.utils import simplify_punctuation
 from .default_config import DEFAULT_CONFIG
-from .get_body_from_soup import get_body_from_soup
+from .compact_document import Document, CompactElement
+from .find_body import get_body_from_soup
 
+WHITESPACE_RE = re.compile(r"\s+")
+# "\b" is a backspace that marks the end of a <br> tag, not a word boundary
+BR_END_RE = re.compile("\b ?")
 
-def convert_tag_to_markdown(tags: Tag) -> str:
+
+def add_markdown(level: List[Any], markdown: str, has_br_end: bool) -> None:
+    """Add a piece of Markdown to a level of convert_tag_to_markdown()."""
+    level[2].append(markdown)
+    if has_br_end and level[3] is None:
+        level[3] = len(level[2]) - 1
+
+
+def convert_tag_to_markdown(tags: Union[Tag, CompactElement]) -> str:
     """
-    Take a BeautifulSoup tag and return a simplified Markdown string.
-    This function is recursive, so it can handle nested tags.
+    Take a BeautifulSoup tag or a compact element and return a simplified
+    Markdown string.
+    Nested tags are walked with a stack instead of recursion, and the
+    Markdown is collected in lists, so the time taken grows linearly.
     """
-    content = ""
-    for tag in tags:
+    # Each level is [tag, its children, pieces of Markdown, index of the first
+    # piece that may contain the end of a <br> tag or None]
+    stack = [[tags, iter(tags), [], None]]
+    while True:
+        level = stack[-1]
+        tag = next(level[1], None)
 
-        # Strings
-        if isinstance(tag, NavigableString):
+        # End of a tag
+        if tag is None:
+            content = "".join(level[2])
+            if len(stack) == 1:
+                return content
+            stack.pop()
+            start, end = ALLOWED_TAGS[level[0].name]
+            content = start + content + end
+            if level[0].name == "blockquote":
+                content = textwrap.indent(content, "> ")
+            add_markdown(stack[-1], content, level[3] is not None)
+
+        # Strings, which are plain strings in compact documents
+        elif isinstance(tag, str):
             # Replace all continuations of whitespaces with a single space
-            str_tag = re.sub(r"\s+", " ", str(tag))
+            str_tag = WHITESPACE_RE.sub(" ", str(tag))
             if str_tag != " ":
-                content += str_tag
+                level[2].append(str_tag)
 
             # Remove the extra space that happens with <br> tags
-            content = re.sub("\b ?", "", content)
-            continue
+            if level[3] is not None:
+                pieces = level[2]
+                pieces[level[3] :] = [BR_END_RE.sub("", "".join(pieces[level[3] :]))]
+                level[3] = None
 
         # Tags
-        if tag.name not in ALLOWED_TAGS:
+        elif tag.name not in ALLOWED_TAGS:
             raise SyntaxError(f"Unsupported tag {tag.name}: {str(tag)}")
-        content += ALLOWED_TAGS[tag.name](tag)
-
-    return content
+        elif isinstance(ALLOWED_TAGS[tag.name], str):
+            markdown = ALLOWED_TAGS[tag.name]
+            add_markdown(level, markdown, "\b" in markdown)
+        else:
+            stack.append([tag, iter(tag), [], None])
 
 
 def each_sentence_on_new_line(content: str) -> str:
@@ -49,28 +83,37 @@ def each_sentence_on_new_line(content: str) -> str:
     return "\n".join(new_content)
 
 
+# The Markdown before and after the content of each tag, or the Markdown
+# that replaces the whole tag. Blockquotes are also indented with "> ".
 ALLOWED_TAGS = {
-    "h1": lambda soup: "# " + convert_tag_to_markdown(soup) + "\n\n",
-    "h2": lambda soup: "## " + convert_tag_to_markdown(soup) + "\n\n",
-    "h3": lambda soup: "### " + convert_tag_to_markdown(soup) + "\n\n",
-    "h4": lambda soup: "#### " + convert_tag_to_markdown(soup) + "\n\n",
-    "h5": lambda soup: "##### " + convert_tag_to_markdown(soup) + "\n\n",
-    "p": lambda soup: convert_tag_to_markdown(soup) + "\n\n",
-    "hr": lambda soup: "---\n\n",
-    "br": lambda soup: "\n\b",  # See: convert_tag_to_markdown()
-    "em": lambda soup: "'" + convert_tag_to_markdown(soup) + "'",
-    "strong": lambda soup: "*" + convert_tag_to_markdown(soup) + "*",
-    "i": lambda soup: convert_tag_to_markdown(soup),  # These two are designed to
-    "b": lambda soup: convert_tag_to_markdown(soup),  # be ignored
-    "blockquote": lambda soup: textwrap.indent(convert_tag_to_markdown(soup), "> "),
+    "h1": ("# ", "\n\n"),
+    "h2": ("## ", "\n\n"),
+    "h3": ("### ", "\n\n"),
+    "h4": ("#### ", "\n\n"),
+    "h5": ("##### ", "\n\n"),
+    "p": ("", "\n\n"),
+    "hr": "---\n\n",
+    "br": "\n\b",  # See: convert_tag_to_markdown()
+    "em": ("'", "'"),
+    "strong": ("*", "*"),
+    "i": ("", ""),  # These two are designed to
+    "b": ("", ""),  # be ignored
+    "blockquote": ("", ""),
 }
 
 
 def soup_to_markdown(
-    soup: BeautifulSoup, templating_variables: Dict[str, str], cfg: Dict[str, Any]
+    soup: Document, templating_variables: Dict[str, str], cfg: Dict[str, Any]
 ) -> str:
-    """Convert a BeautifulSoup object to a simplified Markdown string."""
+    """Convert a document to a simplified Markdown string."""
     body = get_body_from_soup(soup)
     content = convert_tag_to_markdown(body)
     content = simplify_punctuation(content)
     return content
+
+
+def soup_to_paragraph_markdown(
+    soup: Document, templating_variables: Dict[str, str], cfg: Dict[str, Any]
+) -> str:
+    """Convert a document to Markdown with each sentence on its own line."""
+    return each_sentence_on_new_line(soup_to_markdown(soup, templating_variables, cfg))
@@ -1,8 +1,10 @@
+import io
 import re
 import logging
-from typing import Any, Dict
-from bs4 import BeautifulSoup, Tag, NavigableString
-from .get_body_from_soup import get_body_from_soup
+from typing import Any, Dict, TextIO, Union
+from bs4 import Tag
+from .compact_document import Document, CompactElement
+from .find_body import get_body_from_soup
 
 # fmt: off
 ALLOWED_TAGS = {
@@ -24,62 +26,117 @@ ALLOWED_TAGS = {
 
 
 MULTIPLE_WHITESPACE = re.compile(r"\s+")
-
-
-def tags_to_str(parent: Tag, allowed_tags: tuple[str]) -> str:
-    """Iterate over children and convert recursively to string."""
-    parent_content = ""
+SPACES_AROUND_NEWLINES = re.compile(r" *\n *")
+MULTIPLE_NEWLINES = re.compile(r"\n+")
+EMPTY_PARAGRAPH = re.compile(r"<p> +</p>")
+
+# Tags that start a new block, before which the content can be normalised
+BLOCK_TAGS = ("h1", "h2", "h3", "h4", "h5", "p", "hr", "blockquote")
+
+# Marks the place of the content in the template
+CONTENT_MARK = "\0content\0"
+
+
+class SimplifiedHtmlWriter:
+    """
+    Write simplified HTML to a file in blocks, normalising whitespace as the
+    content is written. Only the current block is kept in memory.
+    """
+
+    def __init__(self, file: TextIO):
+        self.file = file
+        self.block = []
+        self.started = False
+
+    def write(self, content: str) -> None:
+        self.block.append(content)
+
+    def end_block(self, last: bool = False) -> None:
+        """
+        Normalise and write the content so far. This must be called only
+        before a block tag, where no whitespace or empty paragraph continues.
+        """
+        content = "".join(self.block)
+        self.block = []
+        if not self.started:
+            content = content.lstrip()
+        if last:
+            content = content.rstrip()
+        content = SPACES_AROUND_NEWLINES.sub("\n", content)
+        content = MULTIPLE_NEWLINES.sub("\n", content)
+        content = EMPTY_PARAGRAPH.sub("<p></p>", content)
+        if content:
+            self.file.write(content)
+            self.started = True
+
+
+def write_tags(
+    parent: Union[Tag, CompactElement],
+    allowed_tags: tuple[str],
+    writer: SimplifiedHtmlWriter,
+) -> None:
+    """Iterate over children and write them recursively."""
     for tag in parent:
 
-        if isinstance(tag, NavigableString):
-            parent_content += MULTIPLE_WHITESPACE.sub(" ", str(tag))
+        # Strings, which are plain strings in compact documents
+        if isinstance(tag, str):
+            writer.write(MULTIPLE_WHITESPACE.sub(" ", str(tag)))
             continue
 
         if tag.name in allowed_tags:
-            format = ALLOWED_TAGS[tag.name]["format"]
-            content = tags_to_str(tag, ALLOWED_TAGS[tag.name]["allowed_tags"])
+            if tag.name in BLOCK_TAGS:
+                writer.end_block()
+            start, _, end = ALLOWED_TAGS[tag.name]["format"].partition("{content}")
+            writer.write(start)
+            write_tags(tag, ALLOWED_TAGS[tag.name]["allowed_tags"], writer)
+            writer.write(end)
         else:
-            format = "{content}"
-            content = tags_to_str(tag, allowed_tags)
+            write_tags(tag, allowed_tags, writer)
 
-        parent_content += format.format(content=content)
 
-    return parent_content
+def write_body(body: Union[Tag, CompactElement], file: TextIO) -> None:
+    """Write the simplified HTML of the body to a file."""
+    writer = SimplifiedHtmlWriter(file)
+    write_tags(body, tuple(ALLOWED_TAGS.keys()), writer)
+    writer.end_block(last=True)
 
 
-def soup_to_simplified_html(
-    soup: BeautifulSoup, templating_variables: Dict[str, str], cfg: Dict[str, Any]
-) -> str:
-    """Convert a BeautifulSoup object to a simplified HTML string."""
+def write_simplified_html(
+    soup: Document,
+    templating_variables: Dict[str, str],
+    cfg: Dict[str, Any],
+    file: TextIO,
+) -> None:
+    """
+    Write a document to a file as simplified HTML. The body is
+    written as it is converted, between the parts of the template before and
+    after the content.
+    """
 
     log = logging.getLogger(__name__)
     body = get_body_from_soup(soup)
 
-    content = tags_to_str(body, tuple(ALLOWED_TAGS.keys())).strip()
-    content = re.sub(r" *\n *", "\n", content)
-    content = re.sub(r"\n+", "\n", content)
-    content = re.sub(r"<p> +</p>", "<p></p>", content)
-    log.debug("Content", extra={"content": content})
-
-    html_tag = soup.find("html")
-    body_tag = soup.find("body")
-    title_tag = soup.find("title")
-    author_tag = soup.find("meta", attrs={"name": "author"})
-    copyright_tag = soup.find("meta", attrs={"name": "copyright"})
-
-    language = (
-        html_tag.get("lang") if html_tag else body_tag.get("lang") if body_tag else "en"
-    )
-    language = language.strip().lower()
-
-    vars_from_html = {
-        "language": language,
-        "title": title_tag.get_text().strip() if title_tag else "",
-        "author": author_tag.get("content", "").strip() if author_tag else "",
-        "copyright": copyright_tag.get("content").strip() if copyright_tag else "",
-        "content": content,
-    }
-    combined_vars = vars_from_html | templating_variables
-    log.debug("Combined templating variables", extra={"combined_vars": combined_vars})
-
-    return cfg["simplified_html_template"].format(**combined_vars)
+    combined_vars = {"content": CONTENT_MARK} | templating_variables
+
+    page = cfg["simplified_html_template"].format(**combined_vars)
+    header, _, footer = page.partition(CONTENT_MARK)
+
+    # The content can be streamed only if it is in the template exactly once
+    if page.count(CONTENT_MARK) != 1:
+        content = io.StringIO()
+        write_body(body, content)
+        file.write(page.replace(CONTENT_MARK, content.getvalue()))
+        return
+
+    file.write(header)
+    write_body(body, file)
+    file.write(footer)
+
+
+def soup_to_simplified_html(
+    soup: Document, templating_variables: Dict[str, str], cfg: Dict[str, Any]
+) -> str:
+    """Convert a document to a simplified HTML string."""
+    file = io.StringIO()
+    write_simplified_html(soup, templating_variables, cfg, file)
+    return file.getvalue()
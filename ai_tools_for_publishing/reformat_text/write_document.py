@@ -0,0 +1,218 @@
+import re
+import string
+import logging
+import os.path
+from datetime import date, datetime
+from ai_tools_for_publishing.utils import open_atomically
+from .compact_document import Document
+from .formats import FORMATS, match_str_to_formats
+from .get_document_variables import get_document_variables
+from typing import Dict, Any, Set
+
+# Variables used for templating the file name and content
+templating_variables: Dict[str, str] = None
+
+
+def get_shared_templating_variables(cfg: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Get the templating variables shared by all files (creating them if necessary).
+
+    :param cfg: A dictionary containing configuration values.
+    :return: A dictionary of templating variables.
+    """
+    log = logging.getLogger(__name__)
+
+    global templating_variables
+    if not templating_variables:
+        templating_variables = {
+            "date": date.today().isoformat(),
+            "time": datetime.now().strftime("%H%M%S"),
+        }
+
+        # Filter out everything but simple strings
+        # or strings that look like templates
+        filtered_cfg = {
+            k: v
+            for k, v in cfg.items()
+            if isinstance(v, str)
+            and ("template" in k or all(c.isalnum() or c in " '._-" for c in v))
+        }
+
+        templating_variables.update(filtered_cfg)
+        log.debug(
+            "Available variables for templating",
+            extra={"variables": templating_variables},
+        )
+
+    return templating_variables
+
+
+def get_template_names(template: str) -> Set[str]:
+    """Return the names of the variables that a template refers to."""
+    return {
+        re.split(r"[.\[]", field_name)[0]
+        for _, field_name, _, _ in string.Formatter().parse(template)
+        if field_name
+    }
+
+
+def get_output_settings(format_name: str, cfg: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Return the settings that the output files of a format depend on, besides
+    the input file: the template of the format and the values of the shared
+    variables that it and the output file name refer to.
+    """
+    template_key = FORMATS[format_name].get("template")
+    template = cfg[template_key] if template_key else None
+    names = get_template_names(cfg["output_name"])
+    if template:
+        names |= get_template_names(template)
+
+    variables = get_shared_templating_variables(cfg)
+    return {
+        "template": template,
+        "variables": {name: variables[name] for name in names if name in variables},
+    }
+
+
+def set_shared_templating_variables(variables: Dict[str, str]) -> None:
+    """Use the templating variables of the main process in a worker process."""
+    global templating_variables
+    templating_variables = variables
+
+
+def get_templating_variables(
+    input_file: str, format: Dict[str, Any], cfg: Dict[str, Any]
+) -> Dict[str, str]:
+    """
+    Get the templating variables of a file in a format. The shared variables
+    are not modified, so files can be handled at the same time.
+
+    :param input_file: The path to the input file.
+    :param format: A dictionary containing format information, including the file extension.
+    :param cfg: A dictionary containing configuration values.
+    :return: A dictionary of templating variables.
+    """
+    return get_shared_templating_variables(cfg) | {
+        "ext": format["extension"],
+        "name": os.path.splitext(os.path.split(input_file)[1])[0],
+    }
+
+
+def get_output_file_name(
+    input_file: str, format: Dict[str, Any], cfg: Dict[str, Any]
+) -> str:
+    """Get the output file name from the configuration and the input file."""
+    log = logging.getLogger(__name__)
+
+    try:
+        templating_variables = get_templating_variables(input_file, format, cfg)
+        output_file = cfg["output_name"].format(**templating_variables)
+    except KeyError as error:
+        raise KeyError(f"Unknown key in output_name '{cfg['output_name']}': {error}")
+
+    output_path = cfg.get("output_path")
+    if output_path:
+        if not os.path.isdir(output_path):
+            raise FileNotFoundError(f"'{output_path}' is not a directory")
+        return os.path.join(output_path, output_file)
+
+    return output_file
+
+
+def may_write_to_file(
+    output_file: str, format: Dict[str, Any], cfg: Dict[str, Any]
+) -> bool:
+    """Check the configuration to see if we may (over)write the output file."""
+    log = logging.getLogger(__name__)
+
+    # If were are not allowed to overwrite an existing file, log the error and continue
+    if os.path.exists(output_file) and not cfg["overwrite"]:
+        log.error(
+            "File already exists and %s is not set",
+            "--overwrite",
+            extra={"file": output_file},
+        )
+        return False
+
+    # If we are in dry run mode, just say what would have been done and continue
+    if cfg["dry_run"]:
+        log.info(
+            f"{format['description']} called %s would have been written...", output_file
+        )
+        return False
+
+    return True
+
+
+def render_format(
+    name: str,
+    soup: Document,
+    templating_variables: Dict[str, str],
+    cfg: Dict[str, Any],
+    outputs: Dict[str, str],
+) -> str:
+    """
+    Return the content of a format, made from the output of the format it is
+    based on if there is one. The outputs are kept for the other formats.
+    """
+    if name not in outputs:
+        format = FORMATS[name]
+        if format.get("based_on"):
+            based_on = render_format(
+                format["based_on"], soup, templating_variables, cfg, outputs
+            )
+            outputs[name] = format["converter"](based_on)
+        else:
+            outputs[name] = format["formatter"](soup, templating_variables, cfg)
+    return outputs[name]
+
+
+def write_soup_to_file(input_file, soup: Document, cfg: Dict[str, Any]) -> None:
+    """
+    Write a document to a file in each format of the configuration, except
+    for the files in `up_to_date_outputs` of the configuration. The variables
+    from the document are looked up only once for all formats.
+    """
+    log = logging.getLogger(__name__)
+
+    document_variables = None
+    outputs = dict()
+    for name, format in match_str_to_formats(cfg["output_format"]).items():
+        output_file = get_output_file_name(input_file, format, cfg)
+        if output_file in cfg.get("up_to_date_outputs", ()):
+            log.debug("%s is up to date", output_file)
+            continue
+
+        if document_variables is None:
+            document_variables = get_document_variables(soup)
+        templating_variables = document_variables | get_templating_variables(
+            input_file, format, cfg
+        )
+        log.debug(
+            "Combined templating variables",
+            extra={"combined_vars": templating_variables},
+        )
+
+        # Formats with a writer are written as they are converted
+        writer = format.get("writer")
+        content = (
+            None
+            if writer
+            else render_format(name, soup, templating_variables, cfg, outputs)
+        )
+
+        # Formats are converted even when they are not written, so that a dry
+        # run still finds the documents that cannot be converted
+        if not may_write_to_file(output_file, format, cfg):
+            if writer:
+                render_format(name, soup, templating_variables, cfg, outputs)
+            continue
+
+        # Write to a temporary file first, so that half an output is never left
+        with open_atomically(output_file) as file:
+            if writer:
+                writer(soup, templating_variables, cfg, file)
+            else:
+                file.write(content)
+            log.info(f"{format['description']} written to %s", output_file)
@@ -1,8 +1,22 @@
-from .yaml import dict_to_yaml_str, read_yaml_file_to_dict
+from .lazy_imports import lazy_imports
+from .atomic_file import open_atomically
 from .punctuation import (
     ALL_PUNCTUATION,
     split_punctuation_from_word,
+    tokenize,
+    log_unknown_punctuation,
     strip_punctuation,
     prettify_punctuation,
     simplify_punctuation,
 )
+
+# PyYAML and importlib.metadata are imported only when needed
+__getattr__ = lazy_imports(
+    __name__,
+    {
+        "dict_to_yaml_str": ".yaml",
+        "read_yaml_file_to_dict": ".yaml",
+        "get_package_version": ".versions",
+        "get_tool_version": ".versions",
+    },
+)
@@ -0,0 +1,39 @@
+import os
+import stat
+import tempfile
+import contextlib
+from typing import IO, Any, Iterator
+
+# The umask can only be read by setting it, which is done once on import
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+
+@contextlib.contextmanager
+def open_atomically(file_name: str, mode: str = "w", **kwargs: Any) -> Iterator[IO]:
+    """
+    Open a file for writing through a temporary file next to it, which
+    replaces the file only when it has been written completely, so that a
+    half written file is never left. The file keeps its permissions, or gets
+    those of a new file. The keyword arguments are passed to open().
+    """
+    # Write through symbolic links, like open() does
+    file_name = os.path.realpath(file_name)
+    file_dir, base_name = os.path.split(file_name)
+
+    with tempfile.NamedTemporaryFile(
+        mode, dir=file_dir, prefix=f".{base_name}.", delete=False, **kwargs
+    ) as file:
+        try:
+            yield file
+            file.close()
+            try:
+                permissions = stat.S_IMODE(os.stat(file_name).st_mode)
+            except FileNotFoundError:
+                permissions = 0o666 & ~UMASK
+            os.chmod(file.name, permissions)
+            os.replace(file.name, file_name)
+        except BaseException:
+            file.close()
+            os.unlink(file.name)
+            raise
@@ -0,0 +1,38 @@
+import sys
+import types
+import importlib
+from typing import Any, Callable, Dict
+
+
+class LazyPackage(types.ModuleType):
+    """A package whose lazily imported names are not replaced by its submodules."""
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        # Importing a submodule sets it as an attribute of the package, which
+        # would hide a lazily imported name of the same name, such as main()
+        if isinstance(value, types.ModuleType) and name in self.__lazy_names__:
+            return
+        super().__setattr__(name, value)
+
+
+def lazy_imports(package: str, names: Dict[str, str]) -> Callable[[str], Any]:
+    """
+    Return a module level __getattr__() that imports names from submodules
+    only when they are used for the first time.
+
+    :param package: The name of the package, i.e. `__name__`.
+    :param names:   The names and the (relative) submodules they are found in.
+    """
+    module = sys.modules[package]
+    module.__lazy_names__ = names
+    module.__class__ = LazyPackage
+
+    def __getattr__(name: str) -> Any:
+        if name not in names:
+            raise AttributeError(f"module '{package}' has no attribute '{name}'")
+
+        value = getattr(importlib.import_module(names[name], package), name)
+        setattr(module, name, value)
+        return value
+
+    return __getattr__
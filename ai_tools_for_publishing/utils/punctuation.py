@@ -1,4 +1,5 @@
 import re
+import string
 import logging
 
 RAW = 0
@@ -37,10 +38,28 @@ for p in CANONIZED_PUNCTUATION:
     PRETTIFY_PUNCTUATION[p[RAW]] = p[PRETTY]
     SIMPLIFY_PUNCTUATION[p[RAW]] = p[SIMPLIFIED]
 
+# The same without the punctuation that stays the same, which would only
+# copy the text. Replacing in order gives the same result as the above.
+PRETTIFY_REPLACEMENTS = tuple(
+    (raw, pretty) for raw, pretty in PRETTIFY_PUNCTUATION.items() if raw != pretty
+)
+SIMPLIFY_REPLACEMENTS = tuple(
+    (raw, simple) for raw, simple in SIMPLIFY_PUNCTUATION.items() if raw != simple
+)
+
 SPLIT_PUNCTUATION_RE = re.compile(
     f"^([{re.escape(ALL_PUNCTUATION)}]*)(.*?)([{re.escape(ALL_PUNCTUATION)}]*)$"
 )
 
+# Same as above, but for every whitespace separated word of a text at once
+NON_SPACE_PUNCTUATION = re.escape(
+    "".join(c for c in ALL_PUNCTUATION if not c.isspace())
+)
+TOKENIZE_RE = re.compile(
+    rf"(\s*)([{NON_SPACE_PUNCTUATION}]*)((?:\S*[^\s{NON_SPACE_PUNCTUATION}])?)"
+    rf"([{NON_SPACE_PUNCTUATION}]*)(?!\S)"
+)
+
 
 def split_punctuation_from_word(word: str) -> str:
     """
@@ -55,6 +74,15 @@ def split_punctuation_from_word(word: str) -> str:
     return (parts[1], parts[2], parts[3])
 
 
+def tokenize(text: str) -> list[tuple[str, str, str, str]]:
+    """
+    Split a text into pieces of four: (whitespace, prefix, word, postfix)
+    Joining all the pieces together gives back the original text.
+    """
+    global TOKENIZE_RE
+    return TOKENIZE_RE.findall(text)
+
+
 def strip_punctuation(word: str) -> str:
     """
     Removes punctuation around the word.
@@ -76,8 +104,8 @@ def prettify_punctuation(word: str) -> str:
     Unify punctuation to be press ready.
     """
     log_unknown_punctuation(word)
-    global PRETTIFY_PUNCTUATION
-    for raw, pretty in PRETTIFY_PUNCTUATION.items():
+    global PRETTIFY_REPLACEMENTS
+    for raw, pretty in PRETTIFY_REPLACEMENTS:
         word = word.replace(raw, pretty)
     return word
 
@@ -87,12 +115,19 @@ def simplify_punctuation(word: str) -> str:
     Unify punctuation to be AI ready.
     """
     log_unknown_punctuation(word)
-    global SIMPLIFY_PUNCTUATION
-    for raw, simple in SIMPLIFY_PUNCTUATION.items():
+    global SIMPLIFY_REPLACEMENTS
+    for raw, simple in SIMPLIFY_REPLACEMENTS:
         word = word.replace(raw, simple)
     return word
 
 
+# Characters that are never unknown punctuation. Other letters, numbers
+# and whitespace are told apart from unknown punctuation one by one.
+KNOWN_CHARACTERS = frozenset(
+    string.ascii_letters + string.digits + string.whitespace + ALL_PUNCTUATION
+)
+KNOWN_ASCII_BYTES = bytes(sorted(ord(c) for c in KNOWN_CHARACTERS if c.isascii()))
+
 already_logged_punctuation = dict()
 
 
@@ -100,18 +135,30 @@ def log_unknown_punctuation(word: str) -> None:
     """
     Check for unknown punctuation characters and log a warning.
     """
-    global ALL_PUNCTUATION
+    global KNOWN_CHARACTERS, KNOWN_ASCII_BYTES
     global already_logged_punctuation
+
+    # Most text is known ASCII, so drop it from the UTF-8 bytes first. What is
+    # left decodes back, because other characters have no ASCII bytes in UTF-8.
+    rest = word.encode("utf-8", "surrogatepass").translate(None, KNOWN_ASCII_BYTES)
+    rest = rest.decode("utf-8", "surrogatepass")
+
+    # Only the distinct characters that have not been seen yet are checked
+    candidates = set(rest).difference(KNOWN_CHARACTERS, already_logged_punctuation)
+    if not candidates:
+        return
+
+    # Anything that is not a letter, a number or whitespace, like [^\w\s] does
+    unknown = [
+        char
+        for char in candidates
+        if not (char.isalnum() or char == "_" or char.isspace())
+    ]
+
     log = logging.getLogger(__name__)
-    for char in word:
-        if (
-            not char.isspace()
-            and not char.isalnum()
-            and char not in ALL_PUNCTUATION
-            and char not in already_logged_punctuation
-        ):
-            log.warning(
-                "Unknown punctuation",
-                extra={"character": char, "unicode": f"U+{ord(char):04x}"},
-            )
-            already_logged_punctuation[char] = True
+    for char in sorted(unknown, key=word.index):
+        log.warning(
+            "Unknown punctuation",
+            extra={"character": char, "unicode": f"U+{ord(char):04x}"},
+        )
+        already_logged_punctuation[char] = True
@@ -0,0 +1,14 @@
+import importlib.metadata
+
+
+def get_package_version(package: str) -> str:
+    """Return the version of an installed package, or "unknown" if not installed."""
+    try:
+        return importlib.metadata.version(package)
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def get_tool_version() -> str:
+    """Return the version of the installed tools, or "unknown" if not installed."""
+    return get_package_version(__package__.split(".")[0])
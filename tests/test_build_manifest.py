@@ -0,0 +1,76 @@
+import os
+import shutil
+import subprocess
+import sys
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE = os.path.join(REPO_DIR, "tests", "fixtures", "chapter.html")
+
+
+def reformat(tmp_path, *args: str) -> None:
+    """Reformat the fixture in tmp_path with the given arguments."""
+    subprocess.run(
+        [sys.executable, "-m", "ai_tools_for_publishing.reformat_text"]
+        + ["--overwrite", "--output-path", str(tmp_path)]
+        + list(args)
+        + [str(tmp_path / "chapter.html")],
+        cwd=REPO_DIR,
+        check=True,
+        capture_output=True,
+    )
+
+
+def get_outputs(tmp_path) -> dict:
+    """Return the identity and time of each output file, which a rewrite changes."""
+    outputs = dict()
+    for entry in os.scandir(tmp_path):
+        if entry.name.startswith("chapter_"):
+            stat = entry.stat()
+            outputs[entry.name] = (stat.st_ino, stat.st_mtime_ns)
+    return outputs
+
+
+@pytest.fixture
+def built(tmp_path):
+    shutil.copy(FIXTURE, tmp_path)
+    reformat(tmp_path, "--output-format", "md,xhtml")
+    outputs = get_outputs(tmp_path)
+    assert len(outputs) == 2
+    return tmp_path, outputs
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        (),
+        ("-vv",),
+        ("-vvv",),
+        ("--log-level", "INFO"),
+        ("--jobs", "2", "--prefetch", "0"),
+    ],
+)
+def test_settings_that_do_not_change_outputs_keep_files_skipped(built, args):
+    tmp_path, outputs = built
+    reformat(tmp_path, "--output-format", "md,xhtml", *args)
+    assert get_outputs(tmp_path) == outputs
+
+
+def test_added_format_does_not_rewrite_other_formats(built):
+    tmp_path, outputs = built
+    reformat(tmp_path, "--output-format", "md,xhtml,simplified_html")
+    new_outputs = get_outputs(tmp_path)
+    assert len(new_outputs) == 3
+    assert {name: new_outputs[name] for name in outputs} == outputs
+
+
+def test_changed_template_rewrites_its_format(built):
+    tmp_path, outputs = built
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text('xhtml_template: "<body>{content}</body>"\n')
+    reformat(tmp_path, "--output-format", "md,xhtml", "--config", str(config_file))
+    new_outputs = get_outputs(tmp_path)
+    assert new_outputs["chapter_reformatted.md"] == outputs["chapter_reformatted.md"]
+    assert (
+        new_outputs["chapter_reformatted.xhtml"] != outputs["chapter_reformatted.xhtml"]
+    )
@@ -0,0 +1,29 @@
+import logging
+import pytest
+
+pytest.importorskip("libvoikko")
+
+from ai_tools_for_publishing.hyphenate_text.main import (
+    hyphenate_document,
+    read_file_to_hyphenate,
+)
+from ai_tools_for_publishing.hyphenate_text.default_config import DEFAULT_CONFIG
+from ai_tools_for_publishing.reformat_text import DEFAULT_CONFIG as REFORMAT_CONFIG
+
+
+def test_read_errors_are_logged_when_the_file_is_hyphenated(tmp_path, caplog):
+    cfg = REFORMAT_CONFIG | DEFAULT_CONFIG
+    input_file = str(tmp_path / "missing.html")
+
+    # Files are read ahead in another thread, which must not log the error
+    with caplog.at_level(logging.ERROR):
+        document = read_file_to_hyphenate(input_file, cfg)
+    assert document[0] is None and document[1]
+    assert caplog.records == []
+
+    with caplog.at_level(logging.ERROR):
+        hyphenated = hyphenate_document(input_file, document, dict(), None, dict(), cfg)
+    assert hyphenated == (None, dict())
+    assert [record.getMessage() for record in caplog.records] == [
+        f"Error while reading {input_file}"
+    ]
@@ -0,0 +1,105 @@
+import os.path
+import re
+import json
+import threading
+import subprocess
+import socketserver
+import sys
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that only reading, formatting or hyphenating documents needs
+HEAVY_MODULES_RE = re.compile(
+    r"^(bs4|markdown_it|libvoikko"
+    r"|ai_tools_for_publishing\.reformat_text\.(soup_to_\w+|read_\w+|\w+_document|find_body|main)"
+    r"|ai_tools_for_publishing\.hyphenate_text\.(voikko|main|hyphenate_body|list_unknown_words))(\.|$)"
+)
+
+# Total import time of a command, the best of a few runs (in microseconds).
+# The imports take tens of milliseconds, this leaves room for slow machines.
+IMPORT_TIME_BUDGET = 250_000
+RUNS = 3
+
+
+def import_times(*args: str, stdout: list = None) -> dict:
+    """
+    Run a command with -X importtime and return the self time of each import.
+    The output of the command is appended to `stdout`, if given.
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", *args],
+        cwd=REPO_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if stdout is not None:
+        stdout.append(process.stdout)
+
+    times = dict()
+    for line in process.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            self_time, _, name = line[len("import time:") :].split("|")
+            if self_time.strip().isdigit():
+                times[name.strip()] = int(self_time)
+    return times
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ("ai_tools_for_publishing.reformat_text", "--help"),
+        ("ai_tools_for_publishing.reformat_text", "--parser", "nope", "x.html"),
+        ("ai_tools_for_publishing.hyphenate_text", "--help"),
+        ("ai_tools_for_publishing.hyphenate_text", "--bogus"),
+    ],
+)
+def test_cli_startup_does_not_import_heavy_modules(args):
+    times = import_times(*args)
+    assert "ai_tools_for_publishing.cli" in times
+    assert [name for name in times if HEAVY_MODULES_RE.match(name)] == []
+
+
+# The response of the fake server to the client
+UNKNOWN_WORDS = {"xylofoni": {"hyphenated": "xy_lo_fo_ni", "count": 1, "files": []}}
+
+
+class UnknownWordsHandler(socketserver.StreamRequestHandler):
+    """Answer a request like a hyphenation server that found an unknown word."""
+
+    def handle(self):
+        self.rfile.readline()
+        response = {"unknown_words": UNKNOWN_WORDS, "errors": []}
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+def test_client_lists_unknown_words_without_heavy_modules(tmp_path):
+    socket_file = str(tmp_path / "hyphenate_text.socket")
+    with socketserver.UnixStreamServer(socket_file, UnknownWordsHandler) as server:
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            stdout = []
+            times = import_times(
+                "ai_tools_for_publishing.hyphenate_text",
+                "--client",
+                "--list-unknown",
+                "--socket-file",
+                socket_file,
+                "x.html",
+                stdout=stdout,
+            )
+        finally:
+            server.shutdown()
+            thread.join()
+
+    assert "xylofoni: xy_lo_fo_ni" in stdout[0]
+    assert [name for name in times if HEAVY_MODULES_RE.match(name)] == []
+
+
+def test_reformat_text_help_is_within_import_time_budget():
+    total = min(
+        sum(import_times("ai_tools_for_publishing.reformat_text", "--help").values())
+        for _ in range(RUNS)
+    )
+    assert total < IMPORT_TIME_BUDGET, f"imports took {total / 1000:.0f} ms"
@@ -0,0 +1,66 @@
+import os.path
+import subprocess
+import sys
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PACKAGES = (
+    "ai_tools_for_publishing.cli",
+    "ai_tools_for_publishing.utils",
+    "ai_tools_for_publishing.reformat_text",
+    "ai_tools_for_publishing.hyphenate_text",
+)
+
+
+def run_python(code: str) -> None:
+    """Run code in a new interpreter, where nothing has been imported yet."""
+    process = subprocess.run(
+        [sys.executable, "-c", code], cwd=REPO_DIR, capture_output=True, text=True
+    )
+    assert process.returncode == 0, process.stderr
+
+
+@pytest.mark.parametrize(
+    "first_import",
+    [
+        "pass",
+        "from ai_tools_for_publishing.reformat_text import open_build_manifest",
+        "from ai_tools_for_publishing.reformat_text import soup_to_markdown",
+        "from ai_tools_for_publishing.reformat_text import main",
+        "from ai_tools_for_publishing.reformat_text import write_soup_to_file, "
+        "read_file_to_soup, get_body_from_soup",
+    ],
+)
+def test_functions_are_imported_as_functions(first_import):
+    run_python(
+        f"""
+import types
+{first_import}
+from ai_tools_for_publishing.reformat_text import (
+    get_body_from_soup,
+    read_file_to_document,
+    read_file_to_soup,
+    write_soup_to_file,
+)
+for function in (get_body_from_soup, read_file_to_document, read_file_to_soup, write_soup_to_file):
+    assert isinstance(function, types.FunctionType), function
+"""
+    )
+
+
+@pytest.mark.parametrize("package", PACKAGES)
+def test_submodules_do_not_hide_names(package):
+    run_python(
+        f"""
+import types
+import pkgutil
+import importlib
+import {package} as package
+for module in pkgutil.iter_modules(package.__path__):
+    if not module.name.startswith("__"):
+        importlib.import_module(f"{package}.{{module.name}}")
+for name in getattr(package, "__lazy_names__", dict()):
+    assert not isinstance(getattr(package, name), types.ModuleType), name
+"""
+    )
@@ -0,0 +1,64 @@
+import glob
+import importlib.util
+import os.path
+import re
+import pytest
+from ai_tools_for_publishing.reformat_text import (
+    DEFAULT_CONFIG,
+    FORMATS,
+    read_file_to_document,
+    read_file_to_soup,
+    write_soup_to_file,
+)
+
+FIXTURES = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "fixtures", "*.*")))
+
+# Parsers that are compared to the built-in html.parser
+PARSERS = ("lxml", "html5lib")
+
+# Whitespace around the doctype and the <html>, <head> and <body> tags, which
+# lxml and html5lib may move or drop (as documented in get_parser())
+DOCUMENT_TAG_WHITESPACE_RE = re.compile(
+    r"\s*(<!DOCTYPE[^>]*>|</?(?:html|head|body)\b[^>]*>)\s*", re.IGNORECASE
+)
+
+
+def write_formats(input_file, document, output_path):
+    """Write a document in every format and return the outputs by format."""
+    output_path.mkdir()
+    cfg = DEFAULT_CONFIG | {
+        "output_format": ",".join(FORMATS),
+        "output_path": str(output_path),
+        "overwrite": True,
+    }
+    write_soup_to_file(input_file, document, cfg)
+
+    outputs = dict()
+    name, _ = os.path.splitext(os.path.basename(input_file))
+    for format_name, format in FORMATS.items():
+        with open(os.path.join(output_path, name + format["extension"])) as file:
+            outputs[format_name] = file.read()
+    return outputs
+
+
+def strip_document_tag_whitespace(text):
+    return DOCUMENT_TAG_WHITESPACE_RE.sub(r"\1", text)
+
+
+@pytest.mark.parametrize("parser", PARSERS)
+@pytest.mark.parametrize("read", (read_file_to_soup, read_file_to_document))
+@pytest.mark.parametrize("input_file", FIXTURES, ids=os.path.basename)
+def test_formats_match_html_parser(input_file, read, parser, tmp_path):
+    if not importlib.util.find_spec(parser):
+        pytest.skip(f"{parser} is not installed")
+
+    expected = write_formats(
+        input_file, read(input_file, "html.parser"), tmp_path / "html.parser"
+    )
+    outputs = write_formats(input_file, read(input_file, parser), tmp_path / parser)
+
+    for format_name in FORMATS:
+        output, expected_output = outputs[format_name], expected[format_name]
+        assert output == expected_output or strip_document_tag_whitespace(
+            output
+        ) == strip_document_tag_whitespace(expected_output), format_name
@@ -0,0 +1,81 @@
+import codecs
+import pytest
+from ai_tools_for_publishing.reformat_text.read_html_file import (
+    SNIFF_SIZE,
+    guess_encoding,
+    read_html_file,
+)
+
+TEXT = "<p>Hyvää päivää – ¡olé!</p>"
+
+
+def write_file(tmp_path, binary):
+    input_file = tmp_path / "input.html"
+    input_file.write_bytes(binary)
+    return str(input_file)
+
+
+def test_no_declaration_is_read_as_utf8(tmp_path):
+    input_file = write_file(tmp_path, TEXT.encode("utf-8"))
+    assert guess_encoding(TEXT.encode("utf-8")) is None
+    assert read_html_file(input_file) == TEXT
+
+
+def test_empty_file(tmp_path):
+    assert read_html_file(write_file(tmp_path, b"")) == ""
+
+
+@pytest.mark.parametrize(
+    "byte_order_mark, encoding",
+    [
+        (codecs.BOM_UTF8, "utf-8"),
+        (codecs.BOM_UTF16_LE, "utf-16-le"),
+        (codecs.BOM_UTF16_BE, "utf-16-be"),
+        (codecs.BOM_UTF32_LE, "utf-32-le"),
+        (codecs.BOM_UTF32_BE, "utf-32-be"),
+    ],
+)
+def test_byte_order_marks(tmp_path, byte_order_mark, encoding):
+    # The byte order mark wins over a conflicting declaration
+    text = '<meta charset="iso-8859-1">' + TEXT
+    input_file = write_file(tmp_path, byte_order_mark + text.encode(encoding))
+    assert read_html_file(input_file) == text
+
+
+def test_xml_declaration(tmp_path):
+    text = '<?xml version="1.0" encoding="ISO-8859-1"?>\n<p>Hyvää päivää</p>'
+    binary = text.encode("iso-8859-1")
+    assert guess_encoding(binary) == "iso-8859-1"
+    assert read_html_file(write_file(tmp_path, binary)) == text
+
+
+@pytest.mark.parametrize(
+    "meta",
+    [
+        '<meta charset="windows-1252">',
+        "<meta charset=windows-1252>",
+        '<meta http-equiv="Content-Type" content="text/html; charset=windows-1252">',
+    ],
+)
+def test_meta_charset(tmp_path, meta):
+    text = f"<html><head>{meta}</head><body>Päivää ‘lainaus’</body></html>"
+    binary = text.encode("windows-1252")
+    assert guess_encoding(binary) == "windows-1252"
+    assert read_html_file(write_file(tmp_path, binary)) == text
+
+
+def test_charset_beyond_sniff_size_is_ignored(tmp_path):
+    text = "<!-- " + "x" * SNIFF_SIZE + ' --><meta charset="iso-8859-1">' + TEXT
+    input_file = write_file(tmp_path, text.encode("utf-8"))
+    assert read_html_file(input_file) == text
+
+
+def test_unknown_codec_is_skipped(tmp_path):
+    text = '<meta charset="no-such-codec">' + TEXT
+    binary = text.encode("utf-8")
+    assert guess_encoding(binary) is None
+    assert read_html_file(write_file(tmp_path, binary)) == text
+
+    # The XML declaration is skipped, but <meta> is still used
+    text = '<?xml version="1.0" encoding="no-such-codec"?><meta charset="latin-1">é'
+    assert guess_encoding(text.encode("latin-1")) == "latin-1"